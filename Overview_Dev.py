@@ -1,14 +1,21 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import pickle
 import os
+import decimation
+import figure_cache
+import insight_cache
+import paged_table
+import sales_data
+import sales_rollup
 # import css_renderer
 from assets.css_presets import html_sidebar, html_header, html_sidebar_clear_filters_btn, html_sidebar_nav_link
 
+CHART_DESCRIPTION_MODEL = "mistralai/devstral-small:free"
+
 def initialize_ai_client():
     """Initialize AI client for chart descriptions"""
     try:
@@ -19,11 +26,8 @@ def initialize_ai_client():
         st.error(f"Failed to initialize AI client: {e}")
         return None
 
-def generate_chart_description(category_data, total_revenue, ai_client):
-    """Generate AI description for category pie chart"""
-    if not ai_client:
-        return "AI description unavailable - client not initialized."
-    
+def build_chart_description_prompt(category_data, total_revenue):
+    """Build the AI prompt describing the category pie chart"""
     # Prepare data for AI analysis
     categories = category_data['customer_category'].tolist()
     amounts = category_data['sale_amount'].tolist()
@@ -68,9 +72,45 @@ Please provide:
 Keep it professional, data-driven, and actionable. Use specific numbers from the data.
 Format with clear headings and bullet points for readability.
 """
+    return prompt
+
+def generate_chart_description(category_data, total_revenue, ai_client, on_token=None):
+    """
+    Generate AI description for category pie chart
+    
+    Args:
+        category_data (pd.DataFrame): Revenue per customer category
+        total_revenue (float): Total revenue of the filtered data
+        ai_client (OpenAI): Client used for the completion
+        on_token (callable): Optional callback that receives each new piece
+            of the streamed response as it arrives. Not called when the
+            description comes from the insight cache.
+        
+    Returns:
+        str: Full description text
+    """
+    if not ai_client:
+        return "AI description unavailable - client not initialized."
+    
+    # Same category totals -> same description, without calling the model again
+    cache = insight_cache.get_insight_cache()
+    cache_key = insight_cache.make_key(
+        {
+            'categories': category_data['customer_category'].astype(str).tolist(),
+            'amounts': category_data['sale_amount'].tolist(),
+            'total_revenue': total_revenue,
+        },
+        'customer_category_description',
+        CHART_DESCRIPTION_MODEL
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    prompt = build_chart_description_prompt(category_data, total_revenue)
     try:
-        response = ai_client.chat.completions.create(
-            model="mistralai/devstral-small:free",
+        stream = ai_client.chat.completions.create(
+            model=CHART_DESCRIPTION_MODEL,
             messages=[
                 {
                     "role": "system", 
@@ -79,14 +119,37 @@ Format with clear headings and bullet points for readability.
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            max_tokens=900
+            max_tokens=900,
+            stream=True
         )
         
-        return response.choices[0].message.content.strip()
+        chunks = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                if on_token:
+                    on_token(chunk.choices[0].delta.content)
+        description = "".join(chunks).strip()
+        if description:
+            cache.set(cache_key, description, 'customer_category_description', CHART_DESCRIPTION_MODEL)
+        return description
         
     except Exception as e:
         return f"Error generating AI description: {str(e)}"
 
+def render_ai_insights(placeholder, text):
+    """Render text into the scrollable AI insights container"""
+    placeholder.markdown(f"""
+    <div class="ai-insights-container">
+        <div class="ai-insights-header">
+            🤖 AI Chart Analysis
+        </div>
+        <div class="ai-insights-content">
+            {text}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
 def create_enhanced_pie_chart(category_dist, is_full_width=True):
     """Create pie chart with dynamic sizing"""
     
@@ -140,6 +203,210 @@ def create_enhanced_pie_chart(category_dist, is_full_width=True):
     
     return fig_category
 
+def create_revenue_trend_chart(trend_points, trend_title):
+    """Revenue trend line with area fill and the peak period annotated"""
+    
+    # Create enhanced chart with gradient and better styling
+    fig_revenue = go.Figure()
+
+    # Add area fill under the line for visual impact
+    fig_revenue.add_trace(go.Scatter(
+        x=trend_points['sale_date'],
+        y=trend_points['sale_amount'],
+        mode='lines+markers',
+        name='Revenue',
+        line=dict(
+            color='#FF6B35',  # Vibrant orange-red for contrast
+            width=4,
+            shape='spline'  # Smooth curves
+        ),
+        marker=dict(
+            size=12, 
+            color='#FF6B35',
+            line=dict(color='white', width=2),
+            symbol='circle'
+        ),
+        fill='tonexty',
+        fillcolor='rgba(255, 107, 53, 0.1)',  # Light fill under line
+        hovertemplate='<b>%{x}</b><br>Revenue: $%{y:,.0f}<extra></extra>'
+    ))
+
+    # Add invisible trace at y=0 for area fill
+    fig_revenue.add_trace(go.Scatter(
+        x=trend_points['sale_date'],
+        y=[0] * len(trend_points),
+        mode='lines',
+        line=dict(color='rgba(0,0,0,0)'),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+
+    # Add value annotations on peaks
+    max_revenue_idx = trend_points['sale_amount'].idxmax()
+    max_revenue_point = trend_points.loc[max_revenue_idx]
+
+    fig_revenue.add_annotation(
+        x=max_revenue_point['sale_date'],
+        y=max_revenue_point['sale_amount'],
+        text=f"Peak: ${max_revenue_point['sale_amount']:,.0f}",
+        showarrow=True,
+        arrowhead=2,
+        arrowcolor='#1F2B3A',
+        arrowwidth=2,
+        bgcolor='#1F2B3A',
+        bordercolor='#FF6B35',
+        borderwidth=2,
+        font=dict(color='white', size=12, family='Segoe UI')
+    )
+
+    fig_revenue.update_layout(
+        title=dict(
+            text=f'{trend_title} Revenue Performance',
+            font=dict(size=20, color='#1F2B3A', family='Segoe UI'),
+            x=0.02 # Left-aligned title
+        ),
+        xaxis=dict(
+            title=dict(text='Period', font=dict(size=14, color='#1F2B3A')),
+            tickfont=dict(size=12, color='#1F2B3A'),
+            gridcolor='rgba(31, 43, 58, 0.1)',
+            linecolor='#1F2B3A',
+            showgrid=True,
+            ticklen=8,          # Length of tick marks
+            tickwidth=1,        # Width of tick marks
+        
+        ),
+        yaxis=dict(
+            title=dict(text='Revenue ($)', font=dict(size=14, color='#1F2B3A')),
+            tickfont=dict(size=12, color='#1F2B3A'),
+            tickformat='$,.0f',
+            gridcolor='rgba(31, 43, 58, 0.1)',
+            linecolor='#1F2B3A',
+            showgrid=True,
+            # tickmode='linear',  # Ensures consistent spacing
+            # dtick='auto',       # Auto-spacing for ticks
+            ticklen=8,          # Length of tick marks
+            tickwidth=1,        # Width of tick marks
+            tickcolor='#1F2B3A' # Color of tick marks
+        ),
+        plot_bgcolor='rgba(65, 143, 222, 0.05)',
+        paper_bgcolor='rgba(244, 246, 251, 0.9)',
+        height=500,
+        margin=dict(t=100, r=20, l=60, b=20),
+        font=dict(family="Segoe UI", size=12, color="#1F2B3A"),
+        hoverlabel=dict(
+            bgcolor="#1F2B3A",
+            font_size=14,
+            font_family="Segoe UI",
+            font_color="white",
+            bordercolor='#FF6B35'
+        ),
+        showlegend=False
+    )
+
+    return fig_revenue
+
+def create_region_pie_chart(region_dist):
+    """Revenue share by warehouse region"""
+    fig_region = px.pie(
+        region_dist, 
+        values='sale_amount', 
+        names='warehouse_region',
+        title='Revenue by Warehouse Region',
+        height=450,
+        color_discrete_sequence=['#418FDE', '#FF6B35', '#1F2B3A', '#8BB8E8', '#F4F6FB', '#E0E7F1']
+    )
+
+    fig_region.update_layout(
+        title=dict(
+            text='Revenue by Warehouse Region',
+            font=dict(size=18, color='#1F2B3A', family='Segoe UI'),
+            x=0.02
+        ),
+        plot_bgcolor='rgba(244, 246, 251, 0.9)',
+        paper_bgcolor='rgba(244, 246, 251, 0.9)',
+        font=dict(family="Segoe UI", size=12, color="#1F2B3A"),
+        margin=dict(t=60, r=40, l=40, b=40),
+        hoverlabel=dict(
+            bgcolor="#1F2B3A",
+            font_size=13,
+            font_family="Segoe UI",
+            font_color="white"
+        ),
+        legend=dict(
+            font=dict(color='#1F2B3A', size=11),
+            bgcolor='rgba(244, 246, 251, 0.8)',
+            bordercolor='rgba(65, 143, 222, 0.2)',
+            borderwidth=1
+        )
+    )
+
+    fig_region.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        textfont_size=11,
+        textfont_color='white',
+        marker=dict(line=dict(color='white', width=2)),
+        hovertemplate='<b>%{label}</b><br>Revenue: $%{value:,.0f}<br>Percentage: %{percent}<extra></extra>'
+    )
+
+    return fig_region
+
+def create_product_pie_chart(product_mix):
+    """Sales volume share by product"""
+    fig_product = px.pie(
+        product_mix, 
+        values='final_tons_sold', 
+        names='product_name',
+        title='Sales Volume by Product Type',
+        height=450,
+        # color_discrete_sequence=['#FF6B35', '#418FDE', '#1F2B3A', '#F4F6FB', '#E0E7F1', '#8BB8E8']
+    )
+    
+    fig_product.update_layout(
+        title=dict(
+            text='Sales Volume by Product Type',
+            font=dict(size=18, color='#1F2B3A', family='Segoe UI'),
+            x=0.5
+        ),
+        plot_bgcolor='#418FDE',  # Match main page background
+        paper_bgcolor='#418FDE',  # Match main page background
+        font=dict(family="Segoe UI", size=12, color="white"),  # White text for contrast
+        margin=dict(t=60, r=40, l=40, b=40),
+        hoverlabel=dict(
+            bgcolor="#1F2B3A",
+            font_size=13,
+            font_family="Segoe UI",
+            font_color="white"
+        ),
+        legend=dict(
+            font=dict(color='white', size=11),  # White legend text
+            bgcolor='rgba(31, 43, 58, 0.8)',  # Dark background for legend
+            bordercolor='rgba(255, 255, 255, 0.3)',
+            borderwidth=1
+        )
+    )
+    
+    fig_product.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        textfont_size=11,
+        textfont_color='white',
+        marker=dict(line=dict(color='white', width=2))
+    )
+
+    return fig_product
+
+def build_customer_table(frame):
+    """Revenue and volume per customer, with numeric columns kept numeric"""
+    customer_table = frame.groupby(['customer_name', 'customer_category', 'warehouse_region'], observed=True).\
+        agg({
+            'sale_amount': 'sum',
+            'final_tons_sold': 'sum'
+        }).reset_index()
+    customer_table['sale_amount'] = customer_table['sale_amount'].round(2)
+    customer_table['final_tons_sold'] = customer_table['final_tons_sold'].round(2)
+    return customer_table
+
 def create_smooth_transition_css():
 
     """CSS for smooth transitions and scrollable description box"""
@@ -290,13 +557,12 @@ def get_cached_ai_client():
 
 st.set_page_config(page_title="Maize Distribution Analytics", layout="wide")
 
-df = pd.read_csv('partial_csv.csv')
-
-df['sale_date'] = pd.to_datetime(df['sale_date'])
-df['year'] = df['sale_date'].dt.year
-df['month'] = df['sale_date'].dt.month
-
-df_filtered = df.copy()
+# Shared, read-only frame - parsed once per process, reloaded only when the CSV changes
+df = sales_data.load_sales_data()
+# Charts and filters run on the day x category x region x product x customer rollup
+sales_cube = sales_rollup.get_sales_rollup()
+sales_filter_engine = sales_cube.filters
+chart_figures = figure_cache.get_figure_cache()
 
 # Get date range from data
 min_date = df['sale_date'].min().date()
@@ -439,14 +705,11 @@ if st.session_state.get('date_preset') in ['Last 30 Days', 'Last 90 Days', 'Last
 else:
     st.sidebar.info(f"📊 **Using Custom Range:** {start_date} to {end_date}")
 
-# Apply date filtering
-df_filtered = df[
-    (df['sale_date'].dt.date >= start_date) & 
-    (df['sale_date'].dt.date <= end_date)
-].copy()
+# Apply date filtering (row positions only - the frame is sliced once all filters are known)
+date_rows = sales_filter_engine.select(start_date, end_date)
 
 # Display current selection
-st.sidebar.info(f"📊 **Selected Period:**\n{start_date} to \n{end_date}\n\n**Records:** {len(df_filtered):,}")
+st.sidebar.info(f"📊 **Selected Period:**\n{start_date} to \n{end_date}\n\n**Records:** {sales_cube.order_count(date_rows):,}")
 
 # Clear All Filters button (updated)
 if st.sidebar.button("Clear All Filters"):
@@ -470,31 +733,31 @@ if st.sidebar.button("Clear All Filters"):
     
     st.rerun()
 
-# Other filters (move this BEFORE the charts)
-customer_options = sorted(df_filtered['customer_name'].unique())  # Use df_filtered here
+# Other filters (move this BEFORE the charts) - options come from the selected period
+# Computed once per date range with a bincount over the codes in that range
+sidebar_options = sales_filter_engine.filter_options.for_dates(start_date, end_date)
+
+customer_options = sidebar_options['customer_name']
 selected_customers = st.sidebar.multiselect('Select Customers', customer_options, default=[], key='customer_filter')
 
-category_options = sorted(df_filtered['customer_category'].unique())  # Use df_filtered here
+category_options = sidebar_options['customer_category']
 selected_categories = st.sidebar.selectbox('Select Customer Category', ['All'] + list(category_options), key='category_filter')
 
-region_options = sorted(df_filtered['warehouse_region'].unique())  # Use df_filtered here
+region_options = sidebar_options['warehouse_region']
 selected_region = st.sidebar.selectbox('Select Region', ['All'] + list(region_options), key='region_filter')
 
-product_options = sorted(df_filtered['product_name'].unique())  # Use df_filtered here
+product_options = sidebar_options['product_name']
 selected_product = st.sidebar.selectbox('Select Product', ['All'] + list(product_options), key='product_filter')
 
-# ⭐ ADD THIS: Apply the additional filters to df_filtered
-if selected_customers:
-    df_filtered = df_filtered[df_filtered['customer_name'].isin(selected_customers)]
-
-if selected_categories != 'All':
-    df_filtered = df_filtered[df_filtered['customer_category'] == selected_categories]
-
-if selected_region != 'All':
-    df_filtered = df_filtered[df_filtered['warehouse_region'] == selected_region]
-
-if selected_product != 'All':
-    df_filtered = df_filtered[df_filtered['product_name'] == selected_product]
+# ⭐ All sidebar filters in one pass, memoized per selection (shared frame - do not modify).
+# df_filtered holds rollup cells, so every groupby below sums pre-aggregated totals.
+sidebar_filters = dict(
+    customers=selected_customers,
+    category=selected_categories,
+    region=selected_region,
+    product=selected_product,
+)
+df_filtered = sales_filter_engine.frame(start_date, end_date, **sidebar_filters)
 
 
 # html_sidebar_nav_link()
@@ -508,7 +771,7 @@ st.title("🌽 Maize Distribution Analytics")
 st.subheader("Basic Insights Dashboard")
 st.markdown("---")
 
-all_year_options = sorted(df['year'].unique())[-1:]
+all_year_options = sorted(df['sale_date'].dt.year.unique())[-1:]
 
 top_most_col1, top_most_col2, top_most_col3, top_most_col4 = st.columns([2,2,2,1])
 
@@ -537,104 +800,32 @@ st.markdown("---")
 # Revenue Trend - Direct styling approach
 st.subheader("📈 Revenue Trend")
 
-monthly_revenue = df_filtered.groupby(df_filtered['sale_date'].dt.strftime('%Y-%m'))[['sale_amount']].sum().reset_index()
-
-# Create enhanced chart with gradient and better styling
-fig_revenue = go.Figure()
-
-# Add area fill under the line for visual impact
-fig_revenue.add_trace(go.Scatter(
-    x=monthly_revenue['sale_date'],
-    y=monthly_revenue['sale_amount'],
-    mode='lines+markers',
-    name='Revenue',
-    line=dict(
-        color='#FF6B35',  # Vibrant orange-red for contrast
-        width=4,
-        shape='spline'  # Smooth curves
-    ),
-    marker=dict(
-        size=12, 
-        color='#FF6B35',
-        line=dict(color='white', width=2),
-        symbol='circle'
-    ),
-    fill='tonexty',
-    fillcolor='rgba(255, 107, 53, 0.1)',  # Light fill under line
-    hovertemplate='<b>%{x}</b><br>Revenue: $%{y:,.0f}<extra></extra>'
-))
-
-# Add invisible trace at y=0 for area fill
-fig_revenue.add_trace(go.Scatter(
-    x=monthly_revenue['sale_date'],
-    y=[0] * len(monthly_revenue),
-    mode='lines',
-    line=dict(color='rgba(0,0,0,0)'),
-    showlegend=False,
-    hoverinfo='skip'
-))
-
-# Add value annotations on peaks
-max_revenue_idx = monthly_revenue['sale_amount'].idxmax()
-max_revenue_point = monthly_revenue.iloc[max_revenue_idx]
-
-fig_revenue.add_annotation(
-    x=max_revenue_point['sale_date'],
-    y=max_revenue_point['sale_amount'],
-    text=f"Peak: ${max_revenue_point['sale_amount']:,.0f}",
-    showarrow=True,
-    arrowhead=2,
-    arrowcolor='#1F2B3A',
-    arrowwidth=2,
-    bgcolor='#1F2B3A',
-    bordercolor='#FF6B35',
-    borderwidth=2,
-    font=dict(color='white', size=12, family='Segoe UI')
+# Granularity label -> (time bucket, chart title prefix)
+TREND_GRANULARITIES = {
+    'Day': ('day', 'Daily'),
+    'Week': ('week', 'Weekly'),
+    'Month': ('month', 'Monthly'),
+    'Quarter': ('quarter', 'Quarterly'),
+}
+trend_granularity = st.radio(
+    "Granularity", list(TREND_GRANULARITIES), index=2, horizontal=True, key='trend_granularity'
 )
+trend_bucket, trend_title = TREND_GRANULARITIES[trend_granularity]
 
-fig_revenue.update_layout(
-    title=dict(
-        text='Monthly Revenue Performance',
-        font=dict(size=20, color='#1F2B3A', family='Segoe UI'),
-        x=0.02 # Left-aligned title
-    ),
-    xaxis=dict(
-        title=dict(text='Period', font=dict(size=14, color='#1F2B3A')),
-        tickfont=dict(size=12, color='#1F2B3A'),
-        gridcolor='rgba(31, 43, 58, 0.1)',
-        linecolor='#1F2B3A',
-        showgrid=True,
-        ticklen=8,          # Length of tick marks
-        tickwidth=1,        # Width of tick marks
-        
-    ),
-    yaxis=dict(
-        title=dict(text='Revenue ($)', font=dict(size=14, color='#1F2B3A')),
-        tickfont=dict(size=12, color='#1F2B3A'),
-        tickformat='$,.0f',
-        gridcolor='rgba(31, 43, 58, 0.1)',
-        linecolor='#1F2B3A',
-        showgrid=True,
-        # tickmode='linear',  # Ensures consistent spacing
-        # dtick='auto',       # Auto-spacing for ticks
-        ticklen=8,          # Length of tick marks
-        tickwidth=1,        # Width of tick marks
-        tickcolor='#1F2B3A' # Color of tick marks
-    ),
-    plot_bgcolor='rgba(65, 143, 222, 0.05)',
-    paper_bgcolor='rgba(244, 246, 251, 0.9)',
-    height=500,
-    margin=dict(t=100, r=20, l=60, b=20),
-    font=dict(family="Segoe UI", size=12, color="#1F2B3A"),
-    hoverlabel=dict(
-        bgcolor="#1F2B3A",
-        font_size=14,
-        font_family="Segoe UI",
-        font_color="white",
-        bordercolor='#FF6B35'
-    ),
-    showlegend=False
+# Sum the filtered cube cells per period using precomputed integer period codes
+chart_rows = sales_filter_engine.select(start_date, end_date, **sidebar_filters)
+revenue_trend = sales_cube.periods.sum(
+    sales_cube.cube['sale_amount'].to_numpy(), trend_bucket, rows=chart_rows,
+    label='sale_date', value_name='sale_amount'
+)
+# Thin long (e.g. daily) series to the point budget; the peak is always kept
+trend_points = decimation.decimate(revenue_trend, 'sale_date', 'sale_amount')
+
+# Built figures are cached by data and layout, so unchanged charts are not rebuilt
+fig_revenue = chart_figures.get_or_build(
+    'revenue_trend', trend_points, lambda: create_revenue_trend_chart(trend_points, trend_title), variant=trend_title
 )
+
 # Display the chart without any wrapper
 st.plotly_chart(fig_revenue, use_container_width=True)
 
@@ -708,7 +899,7 @@ st.plotly_chart(fig_revenue, use_container_width=True)
 st.markdown(create_smooth_transition_css(), unsafe_allow_html=True)
 
 # Prepare data
-category_dist = df_filtered.groupby('customer_category')['sale_amount'].sum().reset_index()
+category_dist = df_filtered.groupby('customer_category', observed=True)['sale_amount'].sum().reset_index()
 total_revenue_filtered = df_filtered['sale_amount'].sum()
 
 # Initialize session state for describe button
@@ -729,36 +920,37 @@ if st.session_state.show_description:
     
     with pie_col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        enhanced_fig = create_enhanced_pie_chart(category_dist, is_full_width=False)
+        enhanced_fig = chart_figures.get_or_build(
+            'category_pie', category_dist, lambda: create_enhanced_pie_chart(category_dist, is_full_width=False),
+            variant='compact'
+        )
         st.plotly_chart(enhanced_fig, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with pie_col2:
         st.markdown('<div class="description-panel">', unsafe_allow_html=True)
         
-        # AI-powered description in scrollable container
-        with st.spinner("🧠 Analyzing chart data..."):
-            ai_client = get_cached_ai_client()
-            if ai_client and len(category_dist) > 0:
-                ai_description = generate_chart_description(
-                    category_dist, 
-                    total_revenue_filtered, 
-                    ai_client
-                )
-                
-                # Scrollable AI insights container
-                st.markdown(f"""
-                <div class="ai-insights-container">
-                    <div class="ai-insights-header">
-                        🤖 AI Chart Analysis
-                    </div>
-                    <div class="ai-insights-content">
-                        {ai_description}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.error("Unable to generate AI description")
+        # AI-powered description in scrollable container, streamed as it is generated
+        ai_client = get_cached_ai_client()
+        if ai_client and len(category_dist) > 0:
+            insights_placeholder = st.empty()
+            render_ai_insights(insights_placeholder, "🧠 Analyzing chart data...")
+            streamed = []
+            
+            def show_partial(text):
+                streamed.append(text)
+                render_ai_insights(insights_placeholder, "".join(streamed) + " ▌")
+            
+            # Cached descriptions return at once; new ones stream into the placeholder
+            ai_description = generate_chart_description(
+                category_dist, 
+                total_revenue_filtered, 
+                ai_client,
+                on_token=show_partial
+            )
+            render_ai_insights(insights_placeholder, ai_description)
+        else:
+            st.error("Unable to generate AI description")
         
         # Compact quick stats below the scrollable box
         if len(category_dist) > 0:
@@ -786,56 +978,19 @@ if st.session_state.show_description:
 else:
     # Full-width layout without description
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    enhanced_fig = create_enhanced_pie_chart(category_dist, is_full_width=True)
+    enhanced_fig = chart_figures.get_or_build(
+        'category_pie', category_dist, lambda: create_enhanced_pie_chart(category_dist, is_full_width=True),
+        variant='full'
+    )
     st.plotly_chart(enhanced_fig, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 
 pie_col3, pie_col4 = st.columns([1, 1])
-region_dist = df_filtered.groupby('warehouse_region')['sale_amount'].sum().reset_index()
+region_dist = df_filtered.groupby('warehouse_region', observed=True)['sale_amount'].sum().reset_index()
 with pie_col3:
     st.subheader("🥧 Warehouse Region Mix")
-    fig_region = px.pie(
-        region_dist, 
-        values='sale_amount', 
-        names='warehouse_region',
-        title='Revenue by Warehouse Region',
-        height=450,
-        color_discrete_sequence=['#418FDE', '#FF6B35', '#1F2B3A', '#8BB8E8', '#F4F6FB', '#E0E7F1']
-    )
-
-    fig_region.update_layout(
-        title=dict(
-            text='Revenue by Warehouse Region',
-            font=dict(size=18, color='#1F2B3A', family='Segoe UI'),
-            x=0.02
-        ),
-        plot_bgcolor='rgba(244, 246, 251, 0.9)',
-        paper_bgcolor='rgba(244, 246, 251, 0.9)',
-        font=dict(family="Segoe UI", size=12, color="#1F2B3A"),
-        margin=dict(t=60, r=40, l=40, b=40),
-        hoverlabel=dict(
-            bgcolor="#1F2B3A",
-            font_size=13,
-            font_family="Segoe UI",
-            font_color="white"
-        ),
-        legend=dict(
-            font=dict(color='#1F2B3A', size=11),
-            bgcolor='rgba(244, 246, 251, 0.8)',
-            bordercolor='rgba(65, 143, 222, 0.2)',
-            borderwidth=1
-        )
-    )
-
-    fig_region.update_traces(
-        textposition='inside',
-        textinfo='percent+label',
-        textfont_size=11,
-        textfont_color='white',
-        marker=dict(line=dict(color='white', width=2)),
-        hovertemplate='<b>%{label}</b><br>Revenue: $%{value:,.0f}<br>Percentage: %{percent}<extra></extra>'
-    )
+    fig_region = chart_figures.get_or_build('region_pie', region_dist, lambda: create_region_pie_chart(region_dist))
 
     # Add container class for styling
     st.markdown('<div class="pie-chart-container">', unsafe_allow_html=True)
@@ -845,49 +1000,10 @@ with pie_col3:
 
 with pie_col4:
     st.subheader("🥧 Product Mix")
-    product_mix = df_filtered.groupby('product_name')['final_tons_sold'].sum().reset_index()
-    
-    fig_product = px.pie(
-        product_mix, 
-        values='final_tons_sold', 
-        names='product_name',
-        title='Sales Volume by Product Type',
-        height=450,
-        # color_discrete_sequence=['#FF6B35', '#418FDE', '#1F2B3A', '#F4F6FB', '#E0E7F1', '#8BB8E8']
-    )
-    
-    fig_product.update_layout(
-        title=dict(
-            text='Sales Volume by Product Type',
-            font=dict(size=18, color='#1F2B3A', family='Segoe UI'),
-            x=0.5
-        ),
-        plot_bgcolor='#418FDE',  # Match main page background
-        paper_bgcolor='#418FDE',  # Match main page background
-        font=dict(family="Segoe UI", size=12, color="white"),  # White text for contrast
-        margin=dict(t=60, r=40, l=40, b=40),
-        hoverlabel=dict(
-            bgcolor="#1F2B3A",
-            font_size=13,
-            font_family="Segoe UI",
-            font_color="white"
-        ),
-        legend=dict(
-            font=dict(color='white', size=11),  # White legend text
-            bgcolor='rgba(31, 43, 58, 0.8)',  # Dark background for legend
-            bordercolor='rgba(255, 255, 255, 0.3)',
-            borderwidth=1
-        )
-    )
-    
-    fig_product.update_traces(
-        textposition='inside',
-        textinfo='percent+label',
-        textfont_size=11,
-        textfont_color='white',
-        marker=dict(line=dict(color='white', width=2))
-    )
+    product_mix = df_filtered.groupby('product_name', observed=True)['final_tons_sold'].sum().reset_index()
     
+    fig_product = chart_figures.get_or_build('product_pie', product_mix, lambda: create_product_pie_chart(product_mix))
+
     # Add container class for styling
     st.markdown('<div class="pie-chart-container">', unsafe_allow_html=True)
     st.plotly_chart(fig_product, use_container_width=True)
@@ -898,39 +1014,27 @@ st.subheader("🔍 Search by Customer Name")
 
 search_value = st.text_input(f"Enter Customer Name:", key='search_input')
 
-if search_value:
-    df_filtered = df_filtered[df_filtered['customer_name'].str.contains(search_value, case=False)]
-
 # Customer table with filtered data
 st.markdown("---")
 st.subheader("Full Data Table")
 
-# Create filtered customer table using the same filtered dataset
-customer_table = df_filtered.groupby(['customer_name', 'customer_category', 'warehouse_region']).\
-    agg({
-        'sale_amount': 'sum',
-        'final_tons_sold': 'sum'
-    }).reset_index()
-
-customer_table = customer_table.sort_values('sale_amount', ascending=False)
-customer_table['sale_amount'] = customer_table['sale_amount'].round(2)
-customer_table['final_tons_sold'] = customer_table['final_tons_sold'].round(2)
-
-# Format revenue as currency
-customer_table['sale_amount'] = customer_table['sale_amount'].apply(lambda x: f"${x:,.2f}")
-
-# Rename columns for better presentation
-customer_table.columns = ['Customer Name', 'Category', 'Region', 'Revenue', 'Volume (Tons)']
-
-st.dataframe(
-    customer_table.style\
-    .apply(lambda x: ['background-color: #ffffff' if i % 2 == 0 else 'background-color: #dbe7f3' for i in range(len(x))], axis=1)\
-    .set_table_styles([
-        {'selector': 'th', 'props': [('background-color', '#418FDE'), ('color', 'white'), ('font-weight', 'bold')]},
-        {'selector': 'thead th:first-child', 'props': [('background-color', '#418FDE'), ('color', 'white')]},
-        {'selector': 'td:first-child', 'props': [('font-weight', 'bold')]}
-    ]),
-    use_container_width=True 
+# Built once per filter selection; sorting, searching and paging only read the visible page
+customer_table = paged_table.get_paged_table(
+    df_filtered, build_customer_table, search_column='customer_name',
+    search_index=sales_filter_engine.name_index
+)
+paged_table.render_paged_table(
+    customer_table,
+    key='customer_table',
+    column_config={
+        'customer_name': st.column_config.TextColumn('Customer Name'),
+        'customer_category': st.column_config.TextColumn('Category'),
+        'warehouse_region': st.column_config.TextColumn('Region'),
+        'sale_amount': st.column_config.NumberColumn('Revenue', format='dollar'),
+        'final_tons_sold': st.column_config.NumberColumn('Volume (Tons)', format='%.2f'),
+    },
+    default_sort='sale_amount',
+    search=search_value
 )
 
 # Add a note about the data
@@ -1,9 +1,15 @@
+import asyncio
 import pandas as pd
 import numpy as np
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI, OpenAI
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import insight_cache
+import sales_data
+import time_buckets
 
 class AIInsightsAnalyzer:
     """
@@ -11,17 +17,20 @@ class AIInsightsAnalyzer:
     Supports different models for different types of analysis
     """
     
-    def __init__(self, api_key: str, base_url: str = "https://openrouter.ai/api/v1"):
+    def __init__(self, api_key: str, base_url: str = "https://openrouter.ai/api/v1",
+                 cache: Optional[insight_cache.InsightCache] = None):
         """
         Initialize the AI Insights Analyzer
         
         Args:
             api_key (str): OpenRouter API key
             base_url (str): API base URL (default: OpenRouter)
+            cache (InsightCache): Cache for generated insights (default: shared on-disk cache)
         """
         self.api_key = api_key
         self.base_url = base_url
         self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.insight_cache = cache or insight_cache.get_insight_cache()
         
         # Different models for different purposes
         self.models = {
@@ -33,13 +42,15 @@ class AIInsightsAnalyzer:
             'free': 'mistralai/devstral-small:free'  # Free tier model
         }
     
-    def analyze_data_summary(self, df: pd.DataFrame, model_type: str = 'insights') -> str:
+    def analyze_data_summary(self, df: pd.DataFrame, model_type: str = 'insights',
+                             on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate high-level insights about the dataset
         
         Args:
             df (pd.DataFrame): The dataset to analyze
             model_type (str): Type of model to use
+            on_token (Callable): Optional callback that receives the text as it streams in
             
         Returns:
             str: AI-generated insights
@@ -56,8 +67,8 @@ class AIInsightsAnalyzer:
             'total_customers': df['customer_name'].nunique(),
             'total_volume': df['final_tons_sold'].sum(),
             'avg_satisfaction': df['satisfaction_rating'].mean(),
-            'top_region': df.groupby('warehouse_region')['sale_amount'].sum().idxmax(),
-            'top_customer_category': df.groupby('customer_category')['sale_amount'].sum().idxmax()
+            'top_region': df.groupby('warehouse_region', observed=True)['sale_amount'].sum().idxmax(),
+            'top_customer_category': df.groupby('customer_category', observed=True)['sale_amount'].sum().idxmax()
         }
         
         prompt = f"""
@@ -83,9 +94,10 @@ Generate 3-4 bullet points highlighting the most important business insights. Fo
 Format as bullet points starting with relevant emojis.
 """
         
-        return self._call_model(prompt, model_type)
+        return self._cached_call(prompt, stats, 'data_summary', model_type, on_token)
     
-    def analyze_chart_data(self, chart_data: Dict, chart_type: str, model_type: str = 'insights') -> str:
+    def analyze_chart_data(self, chart_data: Dict, chart_type: str, model_type: str = 'insights',
+                           on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate insights about specific chart data
         
@@ -93,31 +105,46 @@ Format as bullet points starting with relevant emojis.
             chart_data (Dict): Chart data to analyze
             chart_type (str): Type of chart (pie, line, bar, etc.)
             model_type (str): Model to use for analysis
+            on_token (Callable): Optional callback that receives the text as it streams in
             
         Returns:
             str: AI-generated insights about the chart
         """
         
-        if chart_type == 'revenue_trend':
-            return self._analyze_revenue_trend(chart_data, model_type)
-        elif chart_type == 'customer_category_pie':
-            return self._analyze_category_distribution(chart_data, model_type)
-        elif chart_type == 'regional_performance':
-            return self._analyze_regional_data(chart_data, model_type)
-        elif chart_type == 'product_mix':
-            return self._analyze_product_mix(chart_data, model_type)
-        else:
-            return self._analyze_generic_chart(chart_data, chart_type, model_type)
+        prompt, unavailable = self._chart_prompt(chart_data, chart_type)
+        if prompt is None:
+            return unavailable
+        return self._cached_call(prompt, chart_data, chart_type, model_type, on_token)
     
-    def _analyze_revenue_trend(self, data: Dict, model_type: str) -> str:
+    def _analyze_revenue_trend(self, data: Dict, model_type: str,
+                               on_token: Optional[Callable[[str], None]] = None) -> str:
         """Analyze revenue trend data"""
+        return self.analyze_chart_data(data, 'revenue_trend', model_type, on_token)
+    
+    def _analyze_category_distribution(self, data: Dict, model_type: str,
+                                       on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Analyze customer category pie chart data"""
+        return self.analyze_chart_data(data, 'customer_category_pie', model_type, on_token)
+    
+    def _analyze_regional_data(self, data: Dict, model_type: str,
+                               on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Analyze regional performance data"""
+        return self.analyze_chart_data(data, 'regional_performance', model_type, on_token)
+    
+    def _analyze_product_mix(self, data: Dict, model_type: str,
+                             on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Analyze product mix data"""
+        return self.analyze_chart_data(data, 'product_mix', model_type, on_token)
+    
+    def _revenue_trend_prompt(self, data: Dict) -> Optional[str]:
+        """Build the prompt for revenue trend data (None if the data is missing)"""
         
         # Assuming data has 'months' and 'revenue' lists
         months = data.get('months', [])
         revenues = data.get('revenues', [])
         
         if not months or not revenues:
-            return "📊 Revenue data unavailable for analysis."
+            return None
         
         # Calculate trend metrics
         revenue_change = ((revenues[-1] - revenues[0]) / revenues[0] * 100) if revenues[0] != 0 else 0
@@ -145,16 +172,16 @@ Provide 2-3 insights about:
 Keep it concise and business-focused. Use emojis for visual appeal.
 """
         
-        return self._call_model(prompt, model_type)
+        return prompt
     
-    def _analyze_category_distribution(self, data: Dict, model_type: str) -> str:
-        """Analyze customer category pie chart data"""
+    def _category_distribution_prompt(self, data: Dict) -> Optional[str]:
+        """Build the prompt for customer category pie chart data (None if the data is missing)"""
         
         categories = data.get('categories', [])
         values = data.get('values', [])
         
         if not categories or not values:
-            return "📊 Category distribution data unavailable."
+            return None
         
         total = sum(values)
         percentages = [(v/total)*100 for v in values]
@@ -177,16 +204,16 @@ Provide 2-3 insights about:
 Use emojis and keep it actionable.
 """
         
-        return self._call_model(prompt, model_type)
+        return prompt
     
-    def _analyze_regional_data(self, data: Dict, model_type: str) -> str:
-        """Analyze regional performance data"""
+    def _regional_data_prompt(self, data: Dict) -> Optional[str]:
+        """Build the prompt for regional performance data (None if the data is missing)"""
         
         regions = data.get('regions', [])
         values = data.get('values', [])
         
         if not regions or not values:
-            return "🗺️ Regional data unavailable for analysis."
+            return None
         
         total = sum(values)
         top_region = regions[values.index(max(values))]
@@ -210,16 +237,16 @@ Provide 2-3 insights about:
 Keep it strategic and actionable with emojis.
 """
         
-        return self._call_model(prompt, model_type)
+        return prompt
     
-    def _analyze_product_mix(self, data: Dict, model_type: str) -> str:
-        """Analyze product mix data"""
+    def _product_mix_prompt(self, data: Dict) -> Optional[str]:
+        """Build the prompt for product mix data (None if the data is missing)"""
         
         products = data.get('products', [])
         volumes = data.get('volumes', [])
         
         if not products or not volumes:
-            return "📦 Product mix data unavailable."
+            return None
         
         total_volume = sum(volumes)
         top_product = products[volumes.index(max(volumes))]
@@ -241,10 +268,15 @@ Provide 2-3 insights about:
 Use emojis and focus on operational insights.
 """
         
-        return self._call_model(prompt, model_type)
+        return prompt
     
-    def _analyze_generic_chart(self, data: Dict, chart_type: str, model_type: str) -> str:
+    def _analyze_generic_chart(self, data: Dict, chart_type: str, model_type: str,
+                               on_token: Optional[Callable[[str], None]] = None) -> str:
         """Generic chart analysis for custom charts"""
+        return self._call_model(self._generic_chart_prompt(data, chart_type), model_type, on_token)
+    
+    def _generic_chart_prompt(self, data: Dict, chart_type: str) -> str:
+        """Build the prompt for custom charts"""
         
         prompt = f"""
 Analyze this {chart_type} chart data:
@@ -255,10 +287,115 @@ Provide 2-3 key insights about the patterns, trends, and business implications s
 Focus on actionable business intelligence. Use emojis for visual appeal.
 """
         
-        return self._call_model(prompt, model_type)
+        return prompt
+    
+    def _chart_prompt(self, chart_data: Dict, chart_type: str) -> Tuple[Optional[str], str]:
+        """
+        Build the prompt for a chart type
+        
+        Returns:
+            tuple: (prompt or None if the data is missing, message to show when it is missing)
+        """
+        if chart_type == 'revenue_trend':
+            return self._revenue_trend_prompt(chart_data), "📊 Revenue data unavailable for analysis."
+        elif chart_type == 'customer_category_pie':
+            return self._category_distribution_prompt(chart_data), "📊 Category distribution data unavailable."
+        elif chart_type == 'regional_performance':
+            return self._regional_data_prompt(chart_data), "🗺️ Regional data unavailable for analysis."
+        elif chart_type == 'product_mix':
+            return self._product_mix_prompt(chart_data), "📦 Product mix data unavailable."
+        else:
+            return self._generic_chart_prompt(chart_data, chart_type), ""
+    
+    def analyze_many(self, charts: List[Tuple[str, Dict]], model_type: str = 'insights',
+                     max_concurrency: int = 4, timeout: float = 30.0) -> List[str]:
+        """
+        Generate insights for several charts concurrently
+        
+        Blocking wrapper around analyze_many_async for scripts and Streamlit pages.
+        
+        Args:
+            charts (List[Tuple[str, Dict]]): (chart_type, chart_data) pairs
+            model_type (str): Model to use for analysis
+            max_concurrency (int): Maximum number of requests in flight
+            timeout (float): Seconds allowed for each request
+            
+        Returns:
+            List[str]: Insights in the same order as charts
+        """
+        coroutine = self.analyze_many_async(charts, model_type, max_concurrency, timeout)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # Already inside an event loop (e.g. a notebook): run on a separate thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+    
+    async def analyze_many_async(self, charts: List[Tuple[str, Dict]], model_type: str = 'insights',
+                                 max_concurrency: int = 4, timeout: float = 30.0) -> List[str]:
+        """
+        Generate insights for several charts concurrently
+        
+        Requests fan out over an AsyncOpenAI client, with at most max_concurrency
+        in flight. A request that fails or exceeds timeout yields an
+        "❌ Analysis unavailable" message in its slot, and the other results are still returned.
+        Charts with a cached insight are answered without a request.
+        
+        Args:
+            charts (List[Tuple[str, Dict]]): (chart_type, chart_data) pairs
+            model_type (str): Model to use for analysis
+            max_concurrency (int): Maximum number of requests in flight
+            timeout (float): Seconds allowed for each request
+            
+        Returns:
+            List[str]: Insights in the same order as charts
+        """
+        model_name = self.models.get(model_type, self.models['free'])
+        prompts = [self._chart_prompt(chart_data, chart_type) for chart_type, chart_data in charts]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        keys = [insight_cache.make_key(chart_data, chart_type, model_name) for chart_type, chart_data in charts]
+        
+        async with self._create_async_client() as client:
+            async def analyze(prompt: Optional[str], unavailable: str, key: str, chart_type: str) -> str:
+                if prompt is None:
+                    return unavailable
+                cached = self.insight_cache.get(key)
+                if cached is not None:
+                    return cached
+                async with semaphore:
+                    try:
+                        response = await asyncio.wait_for(
+                            client.chat.completions.create(
+                                model=model_name,
+                                messages=self._build_messages(prompt),
+                                temperature=0.7,
+                                max_tokens=500
+                            ),
+                            timeout
+                        )
+                        insight = response.choices[0].message.content.strip()
+                    except asyncio.TimeoutError:
+                        return f"❌ Analysis unavailable: no response within {timeout:.0f}s"
+                    except Exception as e:
+                        return f"❌ Analysis unavailable: {str(e)}"
+                if insight:
+                    self.insight_cache.set(key, insight, chart_type, model_name)
+                return insight
+            
+            return list(await asyncio.gather(*(
+                analyze(prompt, unavailable, key, chart_type)
+                for (prompt, unavailable), key, (chart_type, _) in zip(prompts, keys, charts)
+            )))
+    
+    def _create_async_client(self) -> AsyncOpenAI:
+        """Async client for batch requests, created per batch so it belongs to the running event loop"""
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
     
     def generate_comparative_insights(self, current_data: Dict, previous_data: Dict, 
-                                    model_type: str = 'insights') -> str:
+                                    model_type: str = 'insights',
+                                    on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate insights comparing current vs previous period data
         
@@ -266,6 +403,7 @@ Focus on actionable business intelligence. Use emojis for visual appeal.
             current_data (Dict): Current period data
             previous_data (Dict): Previous period data for comparison
             model_type (str): Model to use
+            on_token (Callable): Optional callback that receives the text as it streams in
             
         Returns:
             str: Comparative insights
@@ -289,25 +427,27 @@ Provide 3-4 insights about:
 Focus on business impact and actionable insights. Use emojis.
 """
         
-        return self._call_model(prompt, model_type)
+        return self._call_model(prompt, model_type, on_token)
     
     def generate_predictive_insights(self, historical_data: pd.DataFrame, 
-                                   model_type: str = 'insights') -> str:
+                                   model_type: str = 'insights',
+                                   on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Generate forward-looking insights based on historical trends
         
         Args:
             historical_data (pd.DataFrame): Historical sales data
             model_type (str): Model to use
+            on_token (Callable): Optional callback that receives the text as it streams in
             
         Returns:
             str: Predictive insights and recommendations
         """
         
         # Calculate trend metrics
-        monthly_revenue = historical_data.groupby(
-            historical_data['sale_date'].dt.strftime('%Y-%m')
-        )['sale_amount'].sum().reset_index()
+        monthly_revenue = time_buckets.sum_by_period(
+            historical_data['sale_date'], historical_data['sale_amount'], 'month'
+        )
         
         recent_avg = monthly_revenue.tail(3)['sale_amount'].mean()
         older_avg = monthly_revenue.head(3)['sale_amount'].mean()
@@ -332,39 +472,137 @@ Provide 3-4 forward-looking insights about:
 Focus on actionable business intelligence with emojis.
 """
         
-        return self._call_model(prompt, model_type)
+        return self._call_model(prompt, model_type, on_token)
     
-    def _call_model(self, prompt: str, model_type: str) -> str:
+    def _cached_call(self, prompt: str, cache_data: Dict, chart_type: str, model_type: str,
+                     on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Call the model unless the insight cache already holds an answer
+        
+        Args:
+            prompt (str): The prompt to send on a cache miss
+            cache_data (Dict): Data the prompt was built from, used for the cache key
+            chart_type (str): Chart type, used for the cache key
+            model_type (str): Type of model to use
+            on_token (Callable): Optional streaming callback. On a hit it receives the whole text at once.
+            
+        Returns:
+            str: Model response
+        """
+        model_name = self.models.get(model_type, self.models['free'])
+        key = insight_cache.make_key(cache_data, chart_type, model_name)
+        cached = self.insight_cache.get(key)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+        
+        try:
+            insight = self._request_model(prompt, model_type, on_token)
+        except Exception as e:
+            # Failed and partial responses are not cached, so the next view retries
+            return self._unavailable(e, on_token)
+        if insight:
+            self.insight_cache.set(key, insight, chart_type, model_name)
+        return insight
+    
+    def _call_model(self, prompt: str, model_type: str,
+                    on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Call the specified model with the given prompt
         
         Args:
             prompt (str): The prompt to send
             model_type (str): Type of model to use
+            on_token (Callable): Optional callback. When given, the response is
+                streamed and the callback receives each new piece of text as it arrives.
             
         Returns:
-            str: Model response
+            str: Model response, or an "❌ Analysis unavailable" message if the call failed
         """
         try:
-            model_name = self.models.get(model_type, self.models['free'])
+            return self._request_model(prompt, model_type, on_token)
+        except Exception as e:
+            return self._unavailable(e, on_token)
+    
+    def _request_model(self, prompt: str, model_type: str,
+                       on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Call the model, raising if the request or the stream fails
+        
+        Args:
+            prompt (str): The prompt to send
+            model_type (str): Type of model to use
+            on_token (Callable): Optional streaming callback (see _call_model)
             
-            response = self.client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a senior business analyst providing concise, actionable insights. Use emojis appropriately and focus on business value."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+        Returns:
+            str: The complete model response
+        """
+        if on_token is not None:
+            chunks = []
+            for chunk in self._stream_model(prompt, model_type):
+                chunks.append(chunk)
+                on_token(chunk)
+            return "".join(chunks).strip()
+        
+        model_name = self.models.get(model_type, self.models['free'])
+        
+        response = self.client.chat.completions.create(
+            model=model_name,
+            messages=self._build_messages(prompt),
+            temperature=0.7,
+            max_tokens=500
+        )
+        
+        return response.choices[0].message.content.strip()
+    
+    @staticmethod
+    def _unavailable(error: Exception, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Message shown instead of an insight when the model call failed"""
+        message = f"❌ Analysis unavailable: {str(error)}"
+        # A stream that broke off has already shown part of the answer
+        if on_token is not None:
+            on_token(message)
+        return message
+    
+    def _stream_model(self, prompt: str, model_type: str) -> Iterator[str]:
+        """
+        Stream the model response piece by piece
+        
+        Args:
+            prompt (str): The prompt to send
+            model_type (str): Type of model to use
             
-            return response.choices[0].message.content.strip()
+        Yields:
+            str: Text fragments in the order the model produces them
             
-        except Exception as e:
-            return f"❌ Analysis unavailable: {str(e)}"
+        Raises:
+            Exception: If the request fails or the stream breaks off
+        """
+        model_name = self.models.get(model_type, self.models['free'])
+        
+        stream = self.client.chat.completions.create(
+            model=model_name,
+            messages=self._build_messages(prompt),
+            temperature=0.7,
+            max_tokens=500,
+            stream=True
+        )
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    @staticmethod
+    def _build_messages(prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for an analysis prompt"""
+        return [
+            {
+                "role": "system", 
+                "content": "You are a senior business analyst providing concise, actionable insights. Use emojis appropriately and focus on business value."
+            },
+            {"role": "user", "content": prompt}
+        ]
     
     def get_available_models(self) -> Dict[str, str]:
         """Return available models and their purposes"""
@@ -376,14 +614,16 @@ def create_insights_analyzer(api_key: str) -> AIInsightsAnalyzer:
     return AIInsightsAnalyzer(api_key)
 
 def get_dashboard_insights(df: pd.DataFrame, analyzer: AIInsightsAnalyzer, 
-                          model_type: str = 'insights') -> str:
-    """Get overall dashboard insights"""
-    return analyzer.analyze_data_summary(df, model_type)
+                          model_type: str = 'insights',
+                          on_token: Optional[Callable[[str], None]] = None) -> str:
+    """Get overall dashboard insights, streaming them to on_token if given"""
+    return analyzer.analyze_data_summary(df, model_type, on_token)
 
 def get_chart_insights(chart_data: Dict, chart_type: str, 
-                      analyzer: AIInsightsAnalyzer, model_type: str = 'insights') -> str:
-    """Get insights for specific chart data"""
-    return analyzer.analyze_chart_data(chart_data, chart_type, model_type)
+                      analyzer: AIInsightsAnalyzer, model_type: str = 'insights',
+                      on_token: Optional[Callable[[str], None]] = None) -> str:
+    """Get insights for specific chart data, streaming them to on_token if given"""
+    return analyzer.analyze_chart_data(chart_data, chart_type, model_type, on_token)
 
 # Example usage
 if __name__ == "__main__":
@@ -392,7 +632,7 @@ if __name__ == "__main__":
     analyzer = AIInsightsAnalyzer(API_KEY)
     
     # Load sample data
-    df = pd.read_csv("partial_csv.csv", parse_dates=["sale_date"])
+    df = sales_data.load_sales_data("partial_csv.csv")
     
     # Get overall insights
     print("📊 DASHBOARD INSIGHTS:")
@@ -405,7 +645,22 @@ if __name__ == "__main__":
     }
     
     print("\n📈 REVENUE TREND INSIGHTS:")
-    print(analyzer.analyze_chart_data(revenue_data, 'revenue_trend', 'insights'))
+    # Stream the answer to the terminal as it is generated
+    analyzer.analyze_chart_data(revenue_data, 'revenue_trend', 'insights',
+                                on_token=lambda text: print(text, end="", flush=True))
+    print()
+    
+    # Several charts at once, requested concurrently
+    print("\n🧩 BATCH INSIGHTS:")
+    batch = analyzer.analyze_many([
+        ('revenue_trend', revenue_data),
+        ('regional_performance', {
+            'regions': df['warehouse_region'].cat.categories.tolist(),
+            'values': df.groupby('warehouse_region', observed=True)['sale_amount'].sum().tolist()
+        }),
+    ])
+    for insight in batch:
+        print(insight)
     
     # Show available models
     print("\n🤖 AVAILABLE MODELS:")
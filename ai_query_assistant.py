@@ -1,10 +1,16 @@
-import pandas as pd
 import os
-import sqlite3
+import hashlib
+import threading
+import time
 from openai import OpenAI
-from sqlalchemy import create_engine, text
 import streamlit as st
 
+import name_index
+import query_backends
+import sales_data
+import result_cache
+import sql_cache
+
 # Configuration - Use Streamlit secrets in production
 try:
     API_KEY = st.secrets["OPENAI_API_KEY"]
@@ -12,20 +18,35 @@ except:
     # Fallback for local development
     API_KEY = 'your-local-api-key-here'
 
+SQL_MODEL = "mistralai/devstral-small:free"
+
 class AIQueryAssistant:
-    def __init__(self, csv_file_path="partial_csv.csv", api_key=None):
+    def __init__(self, csv_file_path="partial_csv.csv", api_key=None, backend=None):
         """
         Initialize the AI Query Assistant
         
         Args:
             csv_file_path (str): Path to the CSV file
             api_key (str): OpenRouter API key (optional, uses default if not provided)
+            backend (str): Query backend name (optional, uses the deployment setting if not provided)
         """
         self.csv_file_path = csv_file_path
         self.api_key = api_key or API_KEY
-        self.engine = None
+        # Where generated SQL runs; its dialect is part of the prompt (and so of the schema fingerprint)
+        self.backend = query_backends.create_backend(backend)
         self.df = None
+        self.data_version = None
+        self.name_index = None
         self.client = None
+        self._refresh_lock = threading.Lock()
+        
+        # Generated SQL is reused for repeated and rephrased questions
+        self.sql_cache = sql_cache.SQLGenerationCache()
+        # Executed results are reused until the sales data changes
+        self.result_cache = result_cache.QueryResultCache()
+        self.schema_fingerprint = hashlib.sha256(
+            (self._build_prompt("") + SQL_MODEL).encode()
+        ).hexdigest()[:16]
         
         # Initialize components
         self._setup_client()
@@ -44,18 +65,20 @@ class AIQueryAssistant:
             raise
     
     def _setup_database(self):
-        """Load CSV and create SQLite database"""
+        """Load the shared sales data and make sure the backend's sales table is current"""
         try:
-            # Read CSV file
-            self.df = pd.read_csv(self.csv_file_path, parse_dates=["sale_date"])
-            print(f"✅ Loaded CSV with {len(self.df)} records")
+            # Shared typed frame - the CSV is only parsed once per process
+            df, version = sales_data.get_sales_store(self.csv_file_path).snapshot()
+            print(f"✅ Loaded CSV with {len(df)} records")
             
-            # Create SQLite database in memory
-            self.engine = create_engine("sqlite:///sales.db")
-            
-            # Save DataFrame to SQLite
-            self.df.to_sql("sales", self.engine, if_exists="replace", index=False)
-            print("✅ Database setup completed")
+            # Reuse the backend's table while the CSV is unchanged, refresh it when the data version moves
+            status = self.backend.sync(self.csv_file_path, df, version)
+            if version != self.data_version:
+                self.result_cache.invalidate()
+            self.df, self.data_version = df, version
+            # Resolves LIKE patterns on customer_name to exact names for the current data
+            self.name_index = name_index.NameIndex(df['customer_name'].cat.categories)
+            print(f"✅ Database setup completed ({self.backend.name}: {status})")
             
         except FileNotFoundError:
             print(f"❌ Could not find '{self.csv_file_path}'. Please ensure the file exists.")
@@ -64,11 +87,19 @@ class AIQueryAssistant:
             print(f"❌ Database setup failed: {e}")
             raise
     
-    def _generate_sql_query(self, question):
-        """Generate SQL query using OpenAI/OpenRouter"""
-        
-        prompt = f"""
-You are an expert AI assistant that generates **accurate SQL queries for SQLite** databases based on user 
+    def _ensure_current(self):
+        """Re-sync the database if the CSV changed since it was loaded"""
+        _, version = sales_data.get_sales_store(self.csv_file_path).snapshot()
+        if version == self.data_version:
+            return
+        with self._refresh_lock:
+            if version != self.data_version:
+                self._setup_database()
+    
+    def _build_prompt(self, question):
+        """Build the SQL generation prompt for a question"""
+        return f"""
+You are an expert AI assistant that generates **accurate SQL queries for {self.backend.dialect}** databases based on user 
 questions in plain English. 
 You are working with the following table:
 
@@ -95,7 +126,7 @@ You are working with the following table:
 - Use **`customer_company_size`** for company size like 'Small', 'Medium', 'Large' or 'Mega'
 - Use **`final_tons_sold`** if the user refers to "tons" or "tonnes" sold
 - Always filter dates using `sale_date`
-- Assume SQLite syntax
+- Assume {self.backend.dialect} syntax
 - Return **only the SQL query**, no explanations
 - For **`customer_name`**, you can assume that the user may sometimes not be fully sure of the name, in that case use the LIKE operator. For example, the user might say that they need sales for customer that is named something like Downtown Grains
 - Use proper SQL formatting and syntax
@@ -107,10 +138,15 @@ Now, generate a SQL query for the following user question:
 
 Return only the SQL query, nothing else.
 """
+    
+    def _generate_sql_query(self, question):
+        """Generate SQL query using OpenAI/OpenRouter"""
+        
+        prompt = self._build_prompt(question)
 
         try:
             response = self.client.chat.completions.create(
-                model="mistralai/devstral-small:free",
+                model=SQL_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a SQL expert. Return only SQL queries, no explanations."},
                     {"role": "user", "content": prompt}
@@ -135,66 +171,101 @@ Return only the SQL query, nothing else.
             return None
     
     def _execute_sql_query(self, sql_query):
-        """Execute SQL query and return results"""
+        """Execute SQL query and return results, reusing a cached result for the same data version"""
+        data_version, names = self.data_version, self.name_index
+        # customer_name LIKE '...' becomes an IN list the customer_name index can answer
+        # (SQLite only: the index matches case-insensitively, like SQLite's LIKE)
+        if self.backend.dialect == "SQLite":
+            sql_query = name_index.rewrite_like_predicates(sql_query, 'customer_name', names)
+        cached = self.result_cache.get(sql_query, data_version)
+        if cached is not None:
+            return cached, None
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text(sql_query))
-                df_result = pd.DataFrame(result.fetchall(), columns=result.keys())
-                return df_result, None
+            df_result = self.backend.execute(sql_query)
         except Exception as e:
             return None, str(e)
+        self.result_cache.put(sql_query, data_version, df_result)
+        return df_result, None
     
     def query(self, question, verbose=True):
         """
         Main method to ask a question and get results
         
+        Generates the SQL and executes it in a single pass.
+        
         Args:
             question (str): Natural language question
             verbose (bool): Whether to print progress messages
             
         Returns:
-            dict: Contains 'sql', 'result', 'error' keys
+            dict: Contains 'sql', 'result', 'error', 'timings' and 'from_cache' keys.
+                'timings' holds seconds spent in 'generate', 'execute' and 'total'.
+                'from_cache' is True when the SQL came from the generation cache.
         """
+        started = time.perf_counter()
+        timings = {'generate': 0.0, 'execute': 0.0, 'total': 0.0}
+        
         if verbose:
             print(f"\n🤔 Question: {question}")
         
+        self._ensure_current()
+        
         # Generate SQL
         if verbose:
             print("🧠 Generating SQL query...")
-        sql_query = self._generate_sql_query(question)
+        step = time.perf_counter()
+        sql_query = self.sql_cache.lookup(question, self.schema_fingerprint)
+        from_cache = sql_query is not None
+        if not from_cache:
+            sql_query = self._generate_sql_query(question)
+        timings['generate'] = time.perf_counter() - step
         
         if not sql_query:
+            timings['total'] = time.perf_counter() - started
             return {
                 'sql': None,
                 'result': None,
-                'error': 'Failed to generate SQL query'
+                'error': 'Failed to generate SQL query',
+                'timings': timings,
+                'from_cache': False
             }
         
         if verbose:
-            print(f"🔧 Generated SQL:\n{sql_query}")
+            print(f"🔧 {'Cached' if from_cache else 'Generated'} SQL:\n{sql_query}")
         
         # Execute SQL
         if verbose:
             print("⚡ Executing query...")
+        step = time.perf_counter()
         df_result, error = self._execute_sql_query(sql_query)
+        timings['execute'] = time.perf_counter() - step
+        timings['total'] = time.perf_counter() - started
         
         if error:
             if verbose:
                 print(f"❌ Query execution failed: {error}")
+            if from_cache:
+                self.sql_cache.discard_sql(self.schema_fingerprint, sql_query)
             return {
                 'sql': sql_query,
                 'result': None,
-                'error': error
+                'error': error,
+                'timings': timings,
+                'from_cache': from_cache
             }
         else:
+            if not from_cache:
+                self.sql_cache.store(question, self.schema_fingerprint, sql_query)
             if verbose:
-                print(f"✅ Query successful! Returned {len(df_result)} rows")
+                print(f"✅ Query successful! Returned {len(df_result)} rows in {timings['total']:.2f}s")
                 print("\n📊 Results:")
                 print(df_result)
             return {
                 'sql': sql_query,
                 'result': df_result,
-                'error': None
+                'error': None,
+                'timings': timings,
+                'from_cache': from_cache
             }
     
     def run_interactive(self):
@@ -233,6 +304,34 @@ Return only the SQL query, nothing else.
             except Exception as e:
                 print(f"❌ Unexpected error: {e}")
 
+# ====== SHARED ASSISTANTS ======
+_assistants = {}
+_assistants_lock = threading.Lock()
+
+def get_assistant(csv_file_path="partial_csv.csv", api_key=None):
+    """
+    Return the process-wide assistant for a CSV file and API key
+    
+    The first call builds the OpenAI client and syncs the query backend
+    chosen for this deployment (see query_backends). Later calls from any
+    Streamlit session reuse them. The assistant is safe to share: every
+    backend runs each query on its own read-only connection or cursor.
+    
+    Args:
+        csv_file_path (str): Path to the CSV file
+        api_key (str): OpenRouter API key (optional, uses default if not provided)
+        
+    Returns:
+        AIQueryAssistant: Shared assistant instance
+    """
+    backend = query_backends.configured_backend_name()
+    key = (os.path.abspath(csv_file_path), api_key or API_KEY, backend)
+    with _assistants_lock:
+        assistant = _assistants.get(key)
+        if assistant is None:
+            assistant = _assistants[key] = AIQueryAssistant(csv_file_path, api_key, backend)
+        return assistant
+
 # Convenience functions for backward compatibility
 def run_sql(question, csv_file="partial_csv.csv", api_key=None, verbose =True):
     """
@@ -246,7 +345,7 @@ def run_sql(question, csv_file="partial_csv.csv", api_key=None, verbose =True):
     Returns:
         pandas.DataFrame: Query results
     """
-    assistant = AIQueryAssistant(csv_file, api_key)
+    assistant = get_assistant(csv_file, api_key)
     result = assistant.query(question, verbose=verbose)
     
     if result['error']:
@@ -257,11 +356,11 @@ def run_sql(question, csv_file="partial_csv.csv", api_key=None, verbose =True):
 
 def run():
     """Backward compatibility function for interactive mode"""
-    assistant = AIQueryAssistant()
+    assistant = get_assistant()
     assistant.run_interactive()
 
 # Main execution
 if __name__ == "__main__":
     # Create assistant and run interactive mode
-    assistant = AIQueryAssistant()
+    assistant = get_assistant()
     assistant.run_interactive()
@@ -0,0 +1,131 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import sales_data
+import sales_db
+
+# SQL the assistant generates for the example prompts on the AI Query page
+EXAMPLE_QUERIES = {
+    "💰 What are our total sales this year?":
+        "SELECT SUM(sale_amount) AS total_sales FROM sales "
+        "WHERE sale_date >= date('now', 'start of year')",
+    "🏆 Show me top 10 customers by revenue":
+        "SELECT customer_name, SUM(sale_amount) AS total_revenue FROM sales "
+        "GROUP BY customer_name ORDER BY total_revenue DESC LIMIT 10",
+    "📊 Which products sell best?":
+        "SELECT product_name, SUM(final_tons_sold) AS total_tons, SUM(sale_amount) AS total_revenue "
+        "FROM sales GROUP BY product_name ORDER BY total_revenue DESC LIMIT 100",
+    "🌍 Sales breakdown by region":
+        "SELECT warehouse_region, SUM(sale_amount) AS total_sales, COUNT(*) AS orders FROM sales "
+        "GROUP BY warehouse_region ORDER BY total_sales DESC LIMIT 100",
+    "📈 Monthly revenue trends":
+        "SELECT strftime('%Y-%m', sale_date) AS month, SUM(sale_amount) AS revenue FROM sales "
+        "GROUP BY month ORDER BY month LIMIT 100",
+    "⭐ Customers with high satisfaction":
+        "SELECT customer_name, AVG(satisfaction_rating) AS avg_rating FROM sales "
+        "GROUP BY customer_name HAVING avg_rating >= 4 ORDER BY avg_rating DESC LIMIT 100",
+    "🎯 Export vs Local sales comparison":
+        "SELECT customer_category, SUM(sale_amount) AS total_sales FROM sales "
+        "WHERE customer_category IN ('International', 'Local') GROUP BY customer_category",
+    "📦 Average order size by category":
+        "SELECT customer_category, AVG(final_tons_sold) AS avg_tons FROM sales "
+        "GROUP BY customer_category LIMIT 100",
+    "💎 Premium customers (>$100k revenue)":
+        "SELECT customer_name, SUM(sale_amount) AS total_revenue FROM sales "
+        "GROUP BY customer_name HAVING total_revenue > 100000 ORDER BY total_revenue DESC LIMIT 100",
+    "🔍 Sales in Northern region":
+        "SELECT * FROM sales WHERE warehouse_region = 'Northern Highlands' "
+        "AND sale_date >= date('now', '-2 years') LIMIT 100",
+}
+
+
+def scaled_sales(df, scale, years=10):
+    """Repeat the sales history `scale` times, copies shifted back by up to `years` years"""
+    copies = [
+        df.assign(sale_date=df['sale_date'] - pd.Timedelta(days=k * 365 * years // scale))
+        for k in range(scale)
+    ]
+    return pd.concat(copies, ignore_index=True).sort_values('sale_date', kind='stable', ignore_index=True)
+
+
+def build_baseline(df, db_path):
+    """The original layout: pandas to_sql, no indexes, default pragmas"""
+    conn = sqlite3.connect(db_path)
+    try:
+        df.to_sql(sales_db.SALES_TABLE, conn, index=False, if_exists='replace')
+    finally:
+        conn.close()
+    return create_engine(f"sqlite:///{db_path}")
+
+
+def build_tuned(df, db_path, csv_path):
+    """The current layout: typed table, indexes, ANALYZE, tuned read-only pool"""
+    sales_db.sync_sales_table(csv_path, db_path, df, f"bench-{len(df)}")
+    return sales_db.create_query_engine(db_path)
+
+
+def time_query(engine, sql, repeat):
+    """Median seconds to run a query and fetch it into a DataFrame, and the last result"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            result = conn.execute(text(sql))
+            frame = pd.DataFrame(result.fetchall(), columns=result.keys())
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), frame
+
+
+def run_benchmark(csv_path=sales_data.DEFAULT_CSV_PATH, scale=200, repeat=15, workdir=None):
+    """
+    Time the example questions against the original and the tuned database
+
+    Args:
+        csv_path (str): Source CSV file
+        scale (int): How many copies of the sales history to load
+        repeat (int): Runs per query (the median is reported)
+        workdir (str): Directory for the two database files (default: a temp dir)
+    """
+    df = scaled_sales(sales_data.load_sales_data(csv_path), scale)
+    print(f"📦 {len(df):,} sales rows ({scale} x {csv_path})")
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        started = time.perf_counter()
+        baseline = build_baseline(df, os.path.join(tmp, "baseline.db"))
+        print(f"⏱️ Baseline build: {time.perf_counter() - started:.2f}s")
+        started = time.perf_counter()
+        tuned = build_tuned(df, os.path.join(tmp, "tuned.db"), csv_path)
+        print(f"⏱️ Tuned build:    {time.perf_counter() - started:.2f}s\n")
+
+        print(f"{'Question':<42} {'baseline ms':>12} {'tuned ms':>10} {'speedup':>8}  rows")
+        totals = [0.0, 0.0]
+        for question, sql in EXAMPLE_QUERIES.items():
+            before, expected = time_query(baseline, sql, repeat)
+            after, actual = time_query(tuned, sql, repeat)
+            totals[0] += before
+            totals[1] += after
+            same = "" if len(expected) == len(actual) else f" (baseline {len(expected)})"
+            print(f"{question:<42} {before * 1000:>12.2f} {after * 1000:>10.2f} "
+                  f"{before / after:>7.1f}x  {len(actual)}{same}")
+        print(f"{'Total':<42} {totals[0] * 1000:>12.2f} {totals[1] * 1000:>10.2f} "
+              f"{totals[0] / totals[1]:>7.1f}x")
+
+        baseline.dispose()
+        tuned.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sales query database layout")
+    parser.add_argument("csv_path", nargs="?", default=sales_data.DEFAULT_CSV_PATH, help="Source CSV file")
+    parser.add_argument("--scale", type=int, default=200, help="Copies of the sales history to load")
+    parser.add_argument("--repeat", type=int, default=15, help="Runs per query")
+    parser.add_argument("--workdir", default=None, help="Directory for the temporary databases")
+    args = parser.parse_args()
+    run_benchmark(args.csv_path, scale=args.scale, repeat=args.repeat, workdir=args.workdir)
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+STATUS_LEVELS = ['Lost', 'At Risk', 'Declining', 'Active']
+RISK_LEVELS = ['Lost', 'High', 'Medium', 'Low']
+
+# Days without an order after which a customer counts as lost / at risk / declining
+LOST_AFTER_DAYS = 120
+AT_RISK_AFTER_DAYS = 90
+DECLINING_AFTER_DAYS = 60
+# Drop in average order volume (%) that marks a customer as declining
+DECLINING_VOLUME_DROP = 30
+
+# Minimum orders before half-over-half comparisons are made
+MIN_ORDERS_VOLUME_TREND = 4
+MIN_ORDERS_SATISFACTION_TREND = 2
+
+
+def _group_mean(groups, values, n_groups, include=None):
+    """Per-group mean that skips NaN values (NaN for groups with no values)"""
+    valid = ~np.isnan(values)
+    if include is not None:
+        valid &= include
+    sums = np.bincount(groups[valid], weights=values[valid], minlength=n_groups)
+    counts = np.bincount(groups[valid], minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def customer_churn_metrics(df, as_of=None):
+    """
+    Churn indicators for every customer, computed in one vectorized pass
+
+    The rows are sorted once by (customer, sale_date). Every metric is then
+    computed with per-customer bincounts instead of filtering the frame
+    once per customer. "First half" and "second half" split each
+    customer's orders by count, in date order. The volume trend needs at
+    least 4 orders and the satisfaction trend at least 2.
+
+    Args:
+        df (pd.DataFrame): Typed sales rows (customer_name and warehouse_region categorical)
+        as_of (datetime): Reference time for days since the last order (default: now)
+
+    Returns:
+        pd.DataFrame: One row per customer, indexed by customer_name in order of
+        first appearance in df. Columns: total_transactions, total_value,
+        avg_order_size, first_transaction, last_transaction, days_since_last,
+        volume_decline (%), satisfaction_decline, status, risk_level, primary_region
+    """
+    as_of = pd.Timestamp(as_of if as_of is not None else datetime.now())
+    names = df['customer_name'].astype('category')
+    codes = names.cat.codes.to_numpy()
+    known = codes >= 0
+
+    # Dense customer ids in order of first appearance, like Series.unique()
+    customer_codes = pd.unique(codes[known])
+    n_customers = len(customer_codes)
+    dense = np.full(len(names.cat.categories), -1, dtype=np.int64)
+    dense[customer_codes] = np.arange(n_customers)
+
+    positions = np.flatnonzero(known)
+    groups = dense[codes[positions]]
+    dates = df['sale_date'].to_numpy()[positions]
+    order = np.lexsort((dates, groups))
+    groups, dates, positions = groups[order], dates[order], positions[order]
+
+    counts = np.bincount(groups, minlength=n_customers)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(groups)) - starts[groups]
+    first_half = rank < (counts // 2)[groups]
+
+    tons = df['final_tons_sold'].to_numpy(dtype=np.float64)[positions]
+    satisfaction = df['satisfaction_rating'].to_numpy(dtype=np.float64)[positions]
+    amounts = df['sale_amount'].to_numpy(dtype=np.float64)[positions]
+
+    total_value = np.bincount(groups, weights=np.nan_to_num(amounts), minlength=n_customers)
+    avg_order_size = _group_mean(groups, tons, n_customers)
+    first_transaction = dates[starts]
+    last_transaction = dates[starts + counts - 1]
+    days_since_last = ((as_of - pd.DatetimeIndex(last_transaction)) // pd.Timedelta(days=1)).to_numpy()
+
+    first_volume = _group_mean(groups, tons, n_customers, first_half)
+    second_volume = _group_mean(groups, tons, n_customers, ~first_half)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volume_decline = (first_volume - second_volume) / first_volume * 100
+    volume_decline = np.where(
+        (counts >= MIN_ORDERS_VOLUME_TREND) & (first_volume > 0), volume_decline, 0.0
+    )
+
+    satisfaction_decline = (_group_mean(groups, satisfaction, n_customers, first_half)
+                            - _group_mean(groups, satisfaction, n_customers, ~first_half))
+    satisfaction_decline = np.where(counts >= MIN_ORDERS_SATISFACTION_TREND, satisfaction_decline, 0.0)
+
+    status_index = np.select(
+        [days_since_last > LOST_AFTER_DAYS,
+         days_since_last > AT_RISK_AFTER_DAYS,
+         (days_since_last > DECLINING_AFTER_DAYS) | (volume_decline > DECLINING_VOLUME_DROP)],
+        [0, 1, 2],
+        default=3
+    )
+
+    # Most frequent region per customer; ties go to the first region alphabetically, like mode()
+    regions = df['warehouse_region'].astype('category')
+    region_codes = regions.cat.codes.to_numpy()[positions]
+    n_regions = len(regions.cat.categories)
+    has_region = region_codes >= 0
+    region_counts = np.bincount(
+        groups[has_region] * n_regions + region_codes[has_region], minlength=n_customers * n_regions
+    ).reshape(n_customers, n_regions)
+    primary_region = np.where(
+        region_counts.max(axis=1) > 0,
+        np.asarray(regions.cat.categories, dtype=object)[region_counts.argmax(axis=1)] if n_regions else 'Unknown',
+        'Unknown'
+    )
+
+    return pd.DataFrame({
+        'total_transactions': counts.astype(np.int64),
+        'total_value': total_value,
+        'avg_order_size': avg_order_size,
+        'first_transaction': first_transaction,
+        'last_transaction': last_transaction,
+        'days_since_last': days_since_last.astype(np.int64),
+        'volume_decline': volume_decline,
+        'satisfaction_decline': satisfaction_decline,
+        'status': pd.Categorical.from_codes(status_index, STATUS_LEVELS),
+        'risk_level': pd.Categorical.from_codes(status_index, RISK_LEVELS),
+        'primary_region': pd.Categorical(primary_region),
+    }, index=pd.Index(names.cat.categories[customer_codes], name='customer_name'))
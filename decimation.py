@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+# Points a chart sends to the browser at most, split across its series
+DEFAULT_POINT_BUDGET = 1000
+# Fewest points kept per series (first, last and one in between)
+MIN_POINTS_PER_SERIES = 3
+
+DECIMATION_METHODS = ['lttb', 'minmax']
+
+
+def _x_values(column):
+    """Numeric x positions for a column of datetimes, numbers or labels"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64)
+    # Period labels are evenly spaced in time, so their positions will do
+    return np.arange(len(column), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    The first and last points are kept. The points in between are split
+    into n_out - 2 buckets. Each bucket keeps the point that forms the
+    largest triangle with the previously kept point and the mean of the
+    next bucket. This keeps the visual shape of the line: spikes and
+    turning points survive, flat stretches are thinned.
+
+    Args:
+        x (np.ndarray): Increasing x values
+        y (np.ndarray): y values
+        n_out (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < MIN_POINTS_PER_SERIES:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[previous] - next_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (next_y - y[previous]))
+        previous = lo + int(area.argmax())
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max bucketing: keep the lowest and highest point of each bucket
+
+    Cheaper than LTTB and keeps every local extreme at the bucket
+    resolution. Suited to noisy series where the envelope matters.
+
+    Args:
+        y (np.ndarray): y values
+        n_out (int): Approximate number of points to keep
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points
+    """
+    n = len(y)
+    if n_out >= n or n_out < MIN_POINTS_PER_SERIES:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, max(n_out // 2, 1) + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+    # Sorting by (bucket, y) puts each bucket's minimum first and maximum last
+    order = np.lexsort((y, bucket))
+    kept = np.concatenate([[0, n - 1], order[edges[:-1]], order[edges[1:] - 1]])
+    return np.unique(kept)
+
+
+def _series_positions(x, y, n_out, method):
+    if method == 'lttb':
+        positions = lttb_indices(x, y, n_out)
+    elif method == 'minmax':
+        positions = minmax_indices(y, n_out)
+    else:
+        raise ValueError(f"Unknown decimation method '{method}', expected one of {DECIMATION_METHODS}")
+    if len(positions) == len(y) or len(y) == 0:
+        return positions
+    # Peaks and troughs are always drawn exactly, so annotations stay on the line
+    return np.union1d(positions, [int(np.nanargmax(y)), int(np.nanargmin(y))])
+
+
+def decimate(frame, x, y, max_points=DEFAULT_POINT_BUDGET, method='lttb', group=None):
+    """
+    Reduce a line chart's data to a point budget
+
+    Frames within the budget are returned unchanged. Otherwise each series
+    (one per `group` value, or the whole frame) keeps an equal share of the
+    budget. The series' maximum and minimum are always kept.
+
+    Args:
+        frame (pd.DataFrame): Chart data, sorted by x within each series
+        x (str): x column (datetimes, numbers or evenly spaced labels)
+        y (str): y column
+        max_points (int): Point budget for the whole chart
+        method (str): 'lttb' (shape preserving) or 'minmax' (envelope preserving)
+        group (str): Column identifying the series, if there are several
+
+    Returns:
+        pd.DataFrame: Rows of frame that are kept, in their original order
+    """
+    if len(frame) <= max_points:
+        return frame
+
+    if group is None:
+        series = [np.arange(len(frame))]
+    else:
+        codes = pd.factorize(frame[group])[0]
+        series = [np.flatnonzero(codes == code) for code in range(codes.max() + 1)]
+    per_series = max(max_points // max(len(series), 1), MIN_POINTS_PER_SERIES)
+
+    xs = _x_values(frame[x])
+    ys = frame[y].to_numpy(dtype=np.float64)
+    kept = [rows[_series_positions(xs[rows], ys[rows], per_series, method)] for rows in series]
+    return frame.iloc[np.sort(np.concatenate(kept))]
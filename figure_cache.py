@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Built figures kept per process (a few per chart and layout variant)
+MAX_CACHED_FIGURES = 32
+
+
+def data_fingerprint(data):
+    """
+    Content hash of the data a figure is built from
+
+    DataFrames and Series are hashed row by row with pandas' hashing, together
+    with their column names and dtypes. Tuples and lists are hashed item by
+    item. Anything else is hashed through its repr.
+
+    Returns:
+        str: sha1 hex digest
+    """
+    digest = hashlib.sha1()
+
+    def feed(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            frame = value.to_frame() if isinstance(value, pd.Series) else value
+            digest.update(repr([(str(c), str(t)) for c, t in frame.dtypes.items()]).encode())
+            digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        elif isinstance(value, (tuple, list)):
+            digest.update(f"[{len(value)}".encode())
+            for item in value:
+                feed(item)
+        elif isinstance(value, np.ndarray):
+            digest.update(value.tobytes())
+        else:
+            digest.update(repr(value).encode())
+
+    feed(data)
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """
+    LRU cache of built Plotly figures
+
+    Entries are keyed by (chart id, data fingerprint, layout variant). A
+    rerun whose chart data and layout are unchanged gets the figure that
+    was already built, skipping Plotly Express and the layout/trace
+    updates. Only the fingerprint is computed. Cached figures are shared,
+    so callers must not modify them. st.plotly_chart only reads the figure.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_FIGURES):
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, chart_id, data, build, variant=''):
+        """
+        Return the cached figure for this chart, data and variant, building it if needed
+
+        Args:
+            chart_id (str): Identifies the chart (its builder)
+            data: Everything the figure is built from (frames, scalars, or tuples of them)
+            build (callable): Zero-argument function that builds the figure
+            variant (str): Layout variant, e.g. 'full' or 'compact'
+
+        Returns:
+            plotly.graph_objects.Figure: Shared, read-only figure
+        """
+        key = (chart_id, data_fingerprint(data), variant)
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.stats['hits'] += 1
+                return figure
+            self.stats['misses'] += 1
+
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def get_stats(self):
+        """Return hit/miss counters and the number of cached figures"""
+        with self._lock:
+            return {**self.stats, 'figures': len(self._figures)}
+
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+
+def get_figure_cache():
+    """Return the process-wide figure cache, creating it on first use"""
+    global _figure_cache
+    with _figure_cache_lock:
+        if _figure_cache is None:
+            _figure_cache = FigureCache()
+        return _figure_cache
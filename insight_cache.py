@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = "insight_cache.db"
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+# Decimal places the prompts show for each chart type. Inputs are rounded to
+# this precision before hashing, so changes the model would never see still hit.
+CHART_PRECISION = {
+    'revenue_trend': 0,
+    'customer_category_pie': 0,
+    'regional_performance': 0,
+    'product_mix': 1,
+    'data_summary': 1,
+    'customer_category_description': 0,
+}
+
+
+def _rounded(value, precision):
+    """Recursively round floats and convert NumPy/pandas scalars to plain JSON values"""
+    if isinstance(value, dict):
+        return {str(k): _rounded(v, precision) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_rounded(v, precision) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and precision is not None:
+        # Adding 0.0 turns -0.0 into 0.0 so both hash the same
+        return round(value, precision) + 0.0
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def make_key(data, chart_type, model):
+    """
+    Stable cache key for an insight request
+
+    Args:
+        data (dict): Chart data or statistics the prompt is built from
+        chart_type (str): Chart type (selects the rounding precision)
+        model (str): Model name the insight is generated with
+
+    Returns:
+        str: sha256 hex digest
+    """
+    payload = json.dumps(
+        [chart_type, model, _rounded(data, CHART_PRECISION.get(chart_type))],
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class InsightCache:
+    """
+    Persistent cache of generated insight texts
+
+    Entries live in a small SQLite file, so repeated views of an unchanged
+    chart cost no tokens or latency, and the entries survive restarts and are
+    shared between processes. Entries expire after ttl_seconds.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS insight_cache (
+                    key TEXT PRIMARY KEY,
+                    chart_type TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    insight TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("DELETE FROM insight_cache WHERE created_at < ?", (time.time() - ttl_seconds,))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Return the cached insight for a key, or None if missing or expired"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT insight FROM insight_cache WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        with self._lock:
+            self.stats['hits' if row else 'misses'] += 1
+        return row[0] if row else None
+
+    def set(self, key, insight, chart_type='', model=''):
+        """Store a generated insight"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO insight_cache (key, chart_type, model, insight, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, chart_type, model, insight, time.time())
+            )
+        with self._lock:
+            self.stats['stores'] += 1
+
+    def get_stats(self):
+        """Return hit/miss/store counters"""
+        with self._lock:
+            return dict(self.stats)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_insight_cache(path=DEFAULT_CACHE_PATH):
+    """Return the shared insight cache for a file, creating it on first use"""
+    key = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = InsightCache(path)
+        return cache
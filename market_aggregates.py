@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+import sales_filters
+
+# Simulated measures the Competitor page averages
+MARKET_MEASURES = ['price_per_ton', 'market_share', 'service_quality']
+
+
+class MarketAggregates:
+    """
+    Pre-aggregated competitor market data for the Competitor page
+
+    The rows are summed once into dense (day, region, competitor) arrays of
+    sums and counts per measure. Price also gets a sum of squares, for the
+    volatility. Cumulative sums over the days are kept too, so a date range
+    costs two lookups instead of a scan. Every chart mean is sum / count over
+    the selected cells. A sidebar change only slices these small arrays. The
+    simulated rows are never grouped again.
+    """
+
+    def __init__(self, df, measures=MARKET_MEASURES):
+        competitors = df['competitor'].astype('category')
+        regions = df['region'].astype('category')
+        self.competitors = competitors.cat.categories
+        self.regions = regions.cat.categories
+        self.measures = list(measures)
+
+        days, first_rows, day_slot = np.unique(
+            sales_filters.DateIndex(df['date']).days, return_index=True, return_inverse=True
+        )
+        self.dates = pd.DatetimeIndex(df['date'].to_numpy()[first_rows])
+        self.date_index = sales_filters.DateIndex(self.dates)
+
+        shape = (len(days), len(self.regions), len(self.competitors))
+        cells = np.ravel_multi_index(
+            (day_slot, regions.cat.codes.to_numpy(), competitors.cat.codes.to_numpy()), shape
+        )
+        size = int(np.prod(shape))
+
+        def dense(weights=None):
+            return np.bincount(cells, weights=weights, minlength=size).reshape(shape).astype(np.float64)
+
+        self.counts = dense()
+        self.sums = {m: dense(df[m].to_numpy(dtype=np.float64)) for m in self.measures}
+        prices = df['price_per_ton'].to_numpy(dtype=np.float64)
+        self.price_squares = dense(prices * prices)
+
+        # Prefix sums over days with a leading zero row: range [lo, hi) = prefix[hi] - prefix[lo]
+        self._prefix_counts = self._prefix(self.counts)
+        self._prefix_sums = {m: self._prefix(s) for m, s in self.sums.items()}
+        self._prefix_price_squares = self._prefix(self.price_squares)
+
+    @staticmethod
+    def _prefix(values):
+        prefix = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=np.float64)
+        np.cumsum(values, axis=0, out=prefix[1:])
+        return prefix
+
+    def _masks(self, regions, competitors):
+        region_mask = np.isin(self.regions, list(regions))
+        competitor_mask = np.isin(self.competitors, list(competitors))
+        return region_mask, competitor_mask
+
+    def _range_totals(self, prefix, window, region_mask, competitor_mask):
+        """(region, competitor) totals over a day range, restricted to the selected cells"""
+        totals = prefix[window.stop] - prefix[window.start]
+        return totals * np.outer(region_mask, competitor_mask)
+
+    def selection(self, start_date, end_date, regions, competitors):
+        """
+        Resolve sidebar filters to a MarketSelection
+
+        Args:
+            start_date (date): First day included
+            end_date (date): Last day included
+            regions (list): Regions to keep
+            competitors (list): Competitors to keep
+
+        Returns:
+            MarketSelection: Aggregates over the selected days and cells
+        """
+        window = self.date_index.slice(start_date, end_date)
+        region_mask, competitor_mask = self._masks(regions, competitors)
+        return MarketSelection(self, window, region_mask, competitor_mask)
+
+
+class MarketSelection:
+    """Means over one filtered slice of MarketAggregates"""
+
+    def __init__(self, aggregates, window, region_mask, competitor_mask):
+        self.aggregates = aggregates
+        self.window = window
+        self.region_mask = region_mask
+        self.competitor_mask = competitor_mask
+        self.region_competitor_counts = aggregates._range_totals(
+            aggregates._prefix_counts, window, region_mask, competitor_mask
+        )
+
+    def _region_competitor_sums(self, measure):
+        return self.aggregates._range_totals(
+            self.aggregates._prefix_sums[measure], self.window, self.region_mask, self.competitor_mask
+        )
+
+    @staticmethod
+    def _mean(sums, counts):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+    def _competitor_codes(self):
+        return np.flatnonzero(self.competitor_mask)
+
+    def mean(self, measure, competitor=None):
+        """Mean of a measure over all selected rows, or one competitor's rows"""
+        sums = self._region_competitor_sums(measure)
+        counts = self.region_competitor_counts
+        if competitor is not None:
+            column = self.aggregates.competitors.get_indexer([competitor])[0]
+            if column < 0:
+                return np.nan
+            sums, counts = sums[:, column], counts[:, column]
+        return float(self._mean(sums.sum(), counts.sum()))
+
+    def price_std(self):
+        """Sample standard deviation of price_per_ton over the selected rows"""
+        n = self.region_competitor_counts.sum()
+        if n < 2:
+            return np.nan
+        total = self._region_competitor_sums('price_per_ton').sum()
+        squares = self.aggregates._range_totals(
+            self.aggregates._prefix_price_squares, self.window, self.region_mask, self.competitor_mask
+        ).sum()
+        return float(np.sqrt(max(squares - total * total / n, 0.0) / (n - 1)))
+
+    def by_date(self, measure):
+        """
+        Mean of a measure per (date, competitor), in date then competitor order
+
+        Returns:
+            pd.DataFrame: date, competitor and measure columns for the
+            cells that have data
+        """
+        aggregates = self.aggregates
+        window_counts = aggregates.counts[self.window][:, self.region_mask].sum(axis=1)
+        window_sums = aggregates.sums[measure][self.window][:, self.region_mask].sum(axis=1)
+        codes = self._competitor_codes()
+        counts, sums = window_counts[:, codes], window_sums[:, codes]
+        present = (counts > 0).ravel()
+        return pd.DataFrame({
+            'date': np.repeat(aggregates.dates[self.window].to_numpy(), len(codes))[present],
+            'competitor': pd.Categorical.from_codes(np.tile(codes, counts.shape[0])[present],
+                                                    aggregates.competitors),
+            measure: self._mean(sums, counts).ravel()[present],
+        })
+
+    def by_region(self, measure):
+        """Mean of a measure per (region, competitor), in region then competitor order"""
+        aggregates = self.aggregates
+        counts = self.region_competitor_counts
+        present = counts > 0
+        region_codes, competitor_codes = np.nonzero(present)
+        return pd.DataFrame({
+            'region': pd.Categorical.from_codes(region_codes, aggregates.regions),
+            'competitor': pd.Categorical.from_codes(competitor_codes, aggregates.competitors),
+            measure: self._mean(self._region_competitor_sums(measure), counts)[present],
+        })
+
+    def by_competitor(self, measures=None):
+        """Mean of each measure per competitor, for competitors with data"""
+        measures = self.aggregates.measures if measures is None else measures
+        counts = self.region_competitor_counts.sum(axis=0)
+        codes = np.flatnonzero(counts > 0)
+        frame = {'competitor': pd.Categorical.from_codes(codes, self.aggregates.competitors)}
+        for measure in measures:
+            frame[measure] = self._mean(self._region_competitor_sums(measure).sum(axis=0), counts)[codes]
+        return pd.DataFrame(frame)
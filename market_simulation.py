@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+# Competitors with their market positioning (the last one is us)
+DEFAULT_COMPETITORS = {
+    'MaizeCorp Elite': {
+        'base_price': 290, 'market_share': 22, 'service_quality': 9.2,
+        'regions': ['Northern Highlands', 'East Coast', 'Central'], 'strategy': 'Premium Quality'
+    },
+    'GrainGiants International': {
+        'base_price': 265, 'market_share': 25, 'service_quality': 8.1,
+        'regions': ['South', 'West Coast', 'Central'], 'strategy': 'Volume Leader'
+    },
+    'AgriGlobal Solutions': {
+        'base_price': 280, 'market_share': 18, 'service_quality': 8.7,
+        'regions': ['East Coast', 'Northern Highlands'], 'strategy': 'Tech-Enabled'
+    },
+    'FarmFresh Distribution': {
+        'base_price': 255, 'market_share': 15, 'service_quality': 7.9,
+        'regions': ['South', 'West Coast'], 'strategy': 'Cost Leadership'
+    },
+    'Your Company': {
+        'base_price': 275, 'market_share': 20, 'service_quality': 8.5,
+        'regions': ['Northern Highlands', 'South', 'East Coast', 'West Coast', 'Central'], 'strategy': 'Balanced Approach'
+    }
+}
+
+# ====== Daily noise ======
+PRICE_NOISE = 0.03          # daily price variation (±3%)
+SEASONAL_AMPLITUDE = 0.05   # yearly price cycle (±5%)
+SHARE_NOISE = 2.0           # daily market share variation (± points)
+SHARE_BOUNDS = (5, 35)      # market share is kept between 5-35%
+SERVICE_NOISE = 0.2         # daily service quality variation (± points)
+BASE_VOLUME_RANGE = (50, 200)  # baseline tons added to the share-driven volume
+
+
+def simulate_competitor_market(start_date, end_date, competitors=None, seed=42):
+    """
+    Simulate daily competitor prices, market share, service and volume
+
+    All noise is drawn up front as (days x competitors) arrays from one
+    seeded Generator. The arrays are then repeated once per region a
+    competitor serves. Rows come out ordered by date, then competitor, then
+    region. Each competitor has one price, share, service and volume per
+    day, shared by all its regions. Its market share is split evenly across
+    those regions.
+
+    Args:
+        start_date (datetime): First simulated day
+        end_date (datetime): Last simulated day
+        competitors (dict): Competitor name -> base_price, market_share,
+            service_quality, regions, strategy (default: DEFAULT_COMPETITORS)
+        seed (int): Seed for the random generator
+
+    Returns:
+        pd.DataFrame: One row per day, competitor and region with date, competitor,
+        region, price_per_ton, market_share, service_quality, daily_volume_tons and
+        strategy. competitor, region and strategy are categorical.
+    """
+    competitors = DEFAULT_COMPETITORS if competitors is None else competitors
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    names = list(competitors)
+    n_days, n_competitors = len(dates), len(names)
+
+    base_price = np.array([competitors[name]['base_price'] for name in names], dtype=np.float64)
+    base_share = np.array([competitors[name]['market_share'] for name in names], dtype=np.float64)
+    base_service = np.array([competitors[name]['service_quality'] for name in names], dtype=np.float64)
+
+    # Daily values per competitor, shape (days, competitors)
+    shape = (n_days, n_competitors)
+    month_factor = 1 + SEASONAL_AMPLITUDE * np.sin((dates.month.to_numpy() - 1) * np.pi / 6)
+    price = base_price * (1 + rng.uniform(-PRICE_NOISE, PRICE_NOISE, shape)) * month_factor[:, None]
+    share = np.clip(base_share + rng.uniform(-SHARE_NOISE, SHARE_NOISE, shape), *SHARE_BOUNDS)
+    service = base_service + rng.uniform(-SERVICE_NOISE, SERVICE_NOISE, shape)
+    volume = rng.poisson(np.trunc(share * 10)) + rng.integers(*BASE_VOLUME_RANGE, size=shape)
+
+    # One slot per (competitor, region); every day repeats the same slots
+    slot_competitor = np.array(
+        [i for i, name in enumerate(names) for _ in competitors[name]['regions']], dtype=np.int64
+    )
+    slot_regions = [region for name in names for region in competitors[name]['regions']]
+    regions_served = np.array([len(competitors[name]['regions']) for name in names])
+    n_slots = len(slot_competitor)
+
+    region_levels = sorted(set(slot_regions))
+    strategy_levels = sorted({competitors[name]['strategy'] for name in names})
+    strategy_codes = np.array([strategy_levels.index(competitors[name]['strategy']) for name in names])
+    slot_region_codes = np.array([region_levels.index(region) for region in slot_regions], dtype=np.int64)
+
+    def per_slot(values):
+        return values[:, slot_competitor].ravel()
+
+    return pd.DataFrame({
+        'date': np.repeat(dates.to_numpy(), n_slots),
+        'competitor': pd.Categorical.from_codes(np.tile(slot_competitor, n_days), names),
+        'region': pd.Categorical.from_codes(np.tile(slot_region_codes, n_days), region_levels),
+        'price_per_ton': per_slot(price),
+        'market_share': per_slot(share / regions_served),
+        'service_quality': per_slot(service),
+        'daily_volume_tons': per_slot(volume).astype(np.int64),
+        'strategy': pd.Categorical.from_codes(np.tile(strategy_codes[slot_competitor], n_days), strategy_levels),
+    })
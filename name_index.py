@@ -0,0 +1,179 @@
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Memoized query results kept per index
+MAX_CACHED_QUERIES = 256
+# LIKE predicates matching more names than this are left for the database to scan
+MAX_IN_LIST_VALUES = 500
+
+
+def trigrams(text):
+    """Distinct three-character substrings of a (lower-cased) string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """
+    Substring, prefix and LIKE lookups over a set of distinct names
+
+    Built once per set of names (e.g. the customer_name categories). A name
+    is identified by its position (its categorical code). Two structures
+    over the lower-cased names:
+
+    - A prefix trie. Each node holds the codes of the names below it, so a
+      prefix lookup walks one node per character.
+    - Trigram postings: a sorted code array per three-character substring.
+      A substring search intersects the postings of the query's trigrams,
+      then checks the few remaining candidates.
+
+    Queries shorter than three characters scan the distinct names. Results
+    are memoized per query. All matching is case-insensitive, like SQLite's
+    LIKE for ASCII text.
+    """
+
+    def __init__(self, names):
+        self.names = pd.Index(names)
+        self.lowered = [str(name).lower() for name in self.names]
+        self._all = np.arange(len(self.lowered))
+
+        self._trie = {'codes': []}
+        postings = defaultdict(list)
+        for code, name in enumerate(self.lowered):
+            node = self._trie
+            node['codes'].append(code)
+            for char in name:
+                node = node.setdefault(char, {'codes': []})
+                node['codes'].append(code)
+            for gram in trigrams(name):
+                postings[gram].append(code)
+        self._postings = {gram: np.array(codes, dtype=np.int64) for gram, codes in postings.items()}
+        self._freeze(self._trie)
+
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _freeze(self, node):
+        node['codes'] = np.array(node['codes'], dtype=np.int64)
+        for char, child in node.items():
+            if char != 'codes':
+                self._freeze(child)
+
+    def _memoized(self, kind, text, compute):
+        key = (kind, text)
+        with self._lock:
+            codes = self._queries.get(key)
+            if codes is not None:
+                self._queries.move_to_end(key)
+                return codes
+        codes = compute(text)
+        codes.flags.writeable = False
+        with self._lock:
+            self._queries[key] = codes
+            if len(self._queries) > MAX_CACHED_QUERIES:
+                self._queries.popitem(last=False)
+        return codes
+
+    def prefix(self, text):
+        """Codes of names starting with text (sorted)"""
+        def compute(text):
+            node = self._trie
+            for char in text:
+                node = node.get(char)
+                if node is None:
+                    return self._all[:0].copy()
+            return node['codes'].copy()
+        return self._memoized('prefix', text.lower(), compute)
+
+    def _candidates(self, text):
+        """Codes of names containing every trigram of text (a superset of the matches)"""
+        grams = sorted(trigrams(text), key=lambda g: len(self._postings.get(g, ())))
+        candidates = None
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return self._all[:0]
+            candidates = posting if candidates is None else np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        return candidates
+
+    def contains(self, text):
+        """Codes of names containing text as a substring (sorted)"""
+        def compute(text):
+            candidates = self._candidates(text) if len(text) >= 3 else self._all
+            return np.array([code for code in candidates if text in self.lowered[code]], dtype=np.int64)
+        return self._memoized('contains', text.lower(), compute)
+
+    def like(self, pattern):
+        """
+        Codes of names matching a SQL LIKE pattern ('%' any run, '_' one character)
+
+        The longest literal part of the pattern selects candidates through
+        the trie (pattern without a leading wildcard) or the trigram
+        postings. The candidates are then checked against the full pattern.
+        """
+        def compute(pattern):
+            literals = [part for part in re.split(r'[%_]', pattern) if part]
+            if pattern and pattern[0] not in '%_':
+                candidates = self.prefix(literals[0])
+            elif literals:
+                candidates = self.contains(max(literals, key=len))
+            else:
+                candidates = self._all
+            regex = re.compile(
+                ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern), re.DOTALL
+            )
+            return np.array([code for code in candidates if regex.fullmatch(self.lowered[code])], dtype=np.int64)
+        return self._memoized('like', pattern.lower(), compute)
+
+    def values(self, codes):
+        """Names for codes"""
+        return list(self.names[codes])
+
+
+# The closing quote must not be the first half of a doubled quote, so the literal is always matched whole
+_LIKE_PREDICATE = r"(?<![\w.])((?:\w+\.)?{column})\s+(NOT\s+)?LIKE\s+'((?:[^']|'')*)'(?!')"
+_ESCAPE_CLAUSE = re.compile(r"\s*ESCAPE\b", re.IGNORECASE)
+
+
+def _sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def rewrite_like_predicates(sql, column, index, max_values=MAX_IN_LIST_VALUES):
+    """
+    Resolve `column LIKE '<pattern>'` predicates against a name index
+
+    Each predicate becomes `column IN (<matching names>)` (or NOT IN), which
+    the database answers from the column's index instead of a scan with a
+    LIKE test per row. Predicates matching no names or more than max_values
+    names, and LIKE ... ESCAPE, are left unchanged. Patterns are matched
+    case-insensitively, as SQLite's LIKE does, so the rewrite is only
+    equivalent for SQLite.
+
+    Args:
+        sql (str): SQL query
+        column (str): Column the index covers, e.g. 'customer_name'
+        index (NameIndex): Index over the column's distinct values
+        max_values (int): Largest IN list to generate
+
+    Returns:
+        str: The rewritten SQL
+    """
+    predicate = re.compile(_LIKE_PREDICATE.format(column=re.escape(column)), re.IGNORECASE)
+
+    def replace(match):
+        if _ESCAPE_CLAUSE.match(match.string, match.end()):
+            return match.group(0)
+        target, negated, pattern = match.group(1), match.group(2), match.group(3).replace("''", "'")
+        codes = index.like(pattern)
+        if len(codes) == 0 or len(codes) > max_values:
+            return match.group(0)
+        names = ', '.join(_sql_string(name) for name in index.values(codes))
+        return f"{target} {'NOT IN' if negated else 'IN'} ({names})"
+
+    return predicate.sub(replace, sql)
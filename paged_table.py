@@ -0,0 +1,198 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_PAGE_SIZES = [25, 50, 100]
+# Tables kept per process (one per distinct source frame) and searches kept per table
+MAX_CACHED_TABLES = 8
+MAX_CACHED_SEARCHES = 32
+
+
+def _sort_keys(column):
+    """Numeric sort keys for a column: values for numbers, sorted-value ranks otherwise"""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64)
+    if isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.is_monotonic_increasing:
+        return column.cat.codes.to_numpy()
+    return pd.factorize(column, sort=True)[0]
+
+
+class PagedTable:
+    """
+    Sorted, searchable table that is read one page at a time
+
+    The rows keep their numeric dtypes; display formatting is left to the
+    column config. A sort order (row positions) is computed once per column
+    and direction and reused for every page and search. A search is a
+    literal, case-insensitive substring match on one column, evaluated over
+    its distinct values, or resolved through a NameIndex when the column is
+    categorical over the names the index was built on. Only the rows of the
+    requested page are taken from the frame.
+    """
+
+    def __init__(self, frame, search_column=None, search_index=None):
+        self.frame = frame.reset_index(drop=True)
+        self.search_column = search_column
+        column = self.frame[search_column] if search_column is not None else None
+        # The index maps a search to category codes, so it must cover exactly this column's categories
+        self.search_index = search_index if (
+            search_index is not None and isinstance(getattr(column, 'dtype', None), pd.CategoricalDtype)
+            and column.cat.categories.equals(search_index.names)
+        ) else None
+        self._orders = {}
+        self._searches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def order(self, sort_by, ascending=True):
+        """Row positions sorted by a column (stable, memoized)"""
+        key = (sort_by, ascending)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            keys = _sort_keys(self.frame[sort_by])
+            order = np.argsort(keys if ascending else -keys, kind='stable')
+            order.flags.writeable = False
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def matches(self, search):
+        """Boolean mask of rows whose search column contains the text"""
+        text = search.strip().lower()
+        with self._lock:
+            mask = self._searches.get(text)
+        if mask is None:
+            if self.search_index is not None:
+                codes = self.frame[self.search_column].cat.codes.to_numpy()
+                hits = np.zeros(len(self.search_index.names), dtype=bool)
+                hits[self.search_index.contains(text)] = True
+            else:
+                codes, values = pd.factorize(self.frame[self.search_column])
+                hits = np.asarray(pd.Index(values).astype(str).str.lower().str.contains(text, regex=False), dtype=bool)
+            # Extra False slot so missing values (code -1) never match
+            mask = np.append(hits, False)[codes]
+            with self._lock:
+                self._searches[text] = mask
+                if len(self._searches) > MAX_CACHED_SEARCHES:
+                    self._searches.popitem(last=False)
+        return mask
+
+    def count(self, search=''):
+        """Number of rows matching a search"""
+        if search.strip() and self.search_column is not None:
+            return int(self.matches(search).sum())
+        return len(self.frame)
+
+    def page(self, sort_by, ascending=True, search='', page_number=1, page_size=DEFAULT_PAGE_SIZES[0]):
+        """
+        One page of the sorted, searched table
+
+        Args:
+            sort_by (str): Column to sort on
+            ascending (bool): Sort direction
+            search (str): Text to look for in the search column ('' keeps all rows)
+            page_number (int): 1-based page, clamped to the available pages
+            page_size (int): Rows per page
+
+        Returns:
+            tuple: (page DataFrame, number of matching rows, number of pages)
+        """
+        order = self.order(sort_by, ascending)
+        if search.strip() and self.search_column is not None:
+            order = order[self.matches(search)[order]]
+        n_rows = len(order)
+        n_pages = max(1, math.ceil(n_rows / page_size))
+        page_number = min(max(int(page_number), 1), n_pages)
+        start = (page_number - 1) * page_size
+        return self.frame.take(order[start:start + page_size]), n_rows, n_pages
+
+
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def get_paged_table(source, build, search_column=None, search_index=None):
+    """
+    Return the paged table built from a source frame
+
+    Tables are memoized by the identity of the source frame (e.g. a
+    memoized FilterEngine selection). An unchanged selection keeps its
+    sort orders and searches across reruns.
+
+    Args:
+        source (pd.DataFrame): Frame the table is derived from
+        build (callable): Function of source returning the table rows
+        search_column (str): Column the search box matches on
+        search_index (NameIndex): Index over the search column's categories (optional)
+    """
+    key = id(source)
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is not None and entry[0] is source:
+            _tables.move_to_end(key)
+            return entry[1]
+
+    table = PagedTable(build(source), search_column, search_index)
+    with _tables_lock:
+        _tables[key] = (source, table)
+        while len(_tables) > MAX_CACHED_TABLES:
+            _tables.popitem(last=False)
+    return table
+
+
+def render_paged_table(table, key, column_config=None, default_sort=None, default_ascending=False,
+                       search='', page_sizes=DEFAULT_PAGE_SIZES):
+    """
+    Show a PagedTable with sort and paging controls
+
+    Only the current page is sent to st.dataframe.
+
+    Args:
+        table (PagedTable): Table to show
+        key (str): Widget key prefix
+        column_config (dict): st.dataframe column config (labels and number formats)
+        default_sort (str): Column sorted on initially (default: first column)
+        default_ascending (bool): Initial sort direction
+        search (str): Text to filter the search column by
+        page_sizes (list): Page size choices
+    """
+    columns = list(table.frame.columns)
+    column_config = column_config or {}
+
+    def label(column):
+        config = column_config.get(column)
+        if isinstance(config, str):
+            return config
+        return (config or {}).get('label') or column
+
+    sort_col, direction_col, size_col, page_col = st.columns([3, 2, 2, 2])
+    with sort_col:
+        sort_by = st.selectbox(
+            "Sort by", columns, index=columns.index(default_sort) if default_sort in columns else 0,
+            format_func=label, key=f"{key}_sort"
+        )
+    with direction_col:
+        direction = st.selectbox(
+            "Order", ['Descending', 'Ascending'], index=1 if default_ascending else 0, key=f"{key}_order"
+        )
+    with size_col:
+        page_size = st.selectbox("Rows per page", page_sizes, key=f"{key}_page_size")
+
+    ascending = direction == 'Ascending'
+    n_pages = max(1, math.ceil(table.count(search) / page_size))
+    page_key = f"{key}_page"
+    # A narrower search or larger page size can leave the stored page past the end
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    with page_col:
+        page_number = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    rows, n_rows, n_pages = table.page(sort_by, ascending, search, page_number, page_size)
+    st.dataframe(rows, column_config=column_config, hide_index=True, use_container_width=True)
+    first = (int(page_number) - 1) * page_size
+    st.caption(f"Rows {first + 1 if n_rows else 0:,}-{first + len(rows):,} of {n_rows:,} "
+               f"(page {int(page_number)} of {n_pages})")
@@ -132,7 +132,7 @@ if ask_button and user_question.strip():
         
         # Execute query
         try:
-            assistant = ai_query_assistant.AIQueryAssistant()
+            assistant = ai_query_assistant.get_assistant()
             result = assistant.query(user_question, verbose=False)
             
             if result['error']:
@@ -195,7 +195,7 @@ if ask_button and user_question.strip():
                         st.markdown(f"""
                         <div class="stats-card">
                             <h4>⚡ Query Time</h4>
-                            <h2>< 1s</h2>
+                            <h2>{result['timings']['total']:.1f}s</h2>
                         </div>
                         """, unsafe_allow_html=True)
                 
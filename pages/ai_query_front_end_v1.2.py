@@ -6,7 +6,6 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import time
 import ai_query_assistant
 import random
 
@@ -15,9 +14,8 @@ import random
 def get_chart_ai_client():
     """Get AI client for chart generation - Fixed version"""
     try:
-        # Create assistant instance and get client
-        assistant = ai_query_assistant.AIQueryAssistant()
-        return assistant.client  # Access the client directly
+        # Reuse the shared assistant's client
+        return ai_query_assistant.get_assistant().client
     except Exception as e:
         st.error(f"Failed to initialize AI client: {e}")
         return None
@@ -269,12 +267,13 @@ def display_enhanced_results(result_dict, question):
                 """, unsafe_allow_html=True)
         
         with col4:
+            total_time = result_dict.get('timings', {}).get('total')
             st.markdown("""
             <div class="stats-card">
                 <h4>⚡ Query Time</h4>
-                <h2>< 1s</h2>
+                <h2>{}</h2>
             </div>
-            """, unsafe_allow_html=True)
+            """.format(f"{total_time:.1f}s" if total_time is not None else "< 1s"), unsafe_allow_html=True)
     
     # SQL Query Display
     with st.expander("🔧 **View Generated SQL Query**", expanded=False):
@@ -544,39 +543,35 @@ def execute_and_store_query(actual_input):
         
         return
     
-    # Execute new query
+    # Execute new query - one SQL generation and one execution per question
     try:
-        result = ai_query_assistant.run_sql(actual_input, verbose=False)
+        with st.spinner("🤖 Processing your query..."):
+            result_dict = ai_query_assistant.get_assistant().query(actual_input, verbose=False)
         
-        if result is not None:
-            # Convert to our result format
-            assistant = ai_query_assistant.AIQueryAssistant()
-            result_dict = assistant.query(actual_input, verbose=False)
+        # Check if we got a valid result
+        if result_dict and not result_dict.get('error'):
+            # Store results in session state
+            st.session_state[query_key] = {
+                'result_dict': result_dict,
+                'question': actual_input,
+                'timestamp': datetime.now()
+            }
             
-            # Check if we got a valid result
-            if result_dict and not result_dict.get('error'):
-                # Store results in session state
-                st.session_state[query_key] = {
-                    'result_dict': result_dict,
-                    'question': actual_input,
-                    'timestamp': datetime.now()
-                }
-                
-                # Display results
-                display_enhanced_results(result_dict, actual_input)
-                
-                if result_dict['sql']:
-                    display_sql_query_box(result_dict['sql'], actual_input)
-                
-                # Chart generation
-                simple_chart_section(result_dict, actual_input)
-            else:
-                # AI query failed, show test data instead
-                st.error("❌ AI query failed. Showing test data instead:")
-                create_test_data_and_chart()
+            # Display results
+            display_enhanced_results(result_dict, actual_input)
+            
+            if result_dict['sql']:
+                display_sql_query_box(result_dict['sql'], actual_input)
+            
+            # Chart generation
+            simple_chart_section(result_dict, actual_input)
+        elif result_dict and result_dict.get('sql'):
+            # SQL was generated but failed to execute, show test data
+            st.error(f"❌ Query execution failed: {result_dict['error']}. Showing test data instead:")
+            create_test_data_and_chart()
         else:
-            # Query execution failed, show test data
-            st.error("❌ Query execution failed. Showing test data instead:")
+            # AI query failed, show test data instead
+            st.error("❌ AI query failed. Showing test data instead:")
             create_test_data_and_chart()
             
     except Exception as e:
@@ -715,11 +710,7 @@ def main():
     actual_input = st.session_state.get('ai_query_input', '').strip()
 
     if search_button and actual_input:
-        # Show loading
-        with st.spinner("🤖 Processing your query..."):
-            time.sleep(0.5)  # Brief pause for UX
-        
-        # Execute and store query
+        # Execute and store query (shows its own spinner while the AI works)
         execute_and_store_query(actual_input)
     
     elif search_button and not actual_input:
@@ -7,6 +7,11 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import pickle
 import os
+import churn_analytics
+import decimation
+import market_aggregates
+import market_simulation
+import sales_data
 
 # Page configuration
 st.set_page_config(
@@ -56,179 +61,75 @@ st.html("""
         
 """)
 
-# Load or generate competitor data
-@st.cache_data
-def generate_enhanced_competitor_data():
-    np.random.seed(42)
-    
-    # Read your main CSV data
-    try:
-        main_df = pd.read_csv('partial_csv.csv')
-        main_df['sale_date'] = pd.to_datetime(main_df['sale_date'])
-    except FileNotFoundError:
-        st.error("Please ensure partial_csv.csv is in the same directory.")
-        st.stop()
-    
-    # Analyze actual customer patterns to detect churn
-    customer_analysis = {}
-    for customer in main_df['customer_name'].unique():
-        customer_data = main_df[main_df['customer_name'] == customer].sort_values('sale_date')
-        
-        total_transactions = len(customer_data)
-        total_value = customer_data['sale_amount'].sum()
-        avg_order_size = customer_data['final_tons_sold'].mean()
-        first_transaction = customer_data['sale_date'].min()
-        last_transaction = customer_data['sale_date'].max()
-        
-        # Calculate days since last transaction
-        days_since_last = (datetime.now() - last_transaction).days
-        
-        # Calculate volume decline (first half vs second half)
-        if total_transactions >= 4:
-            mid_point = total_transactions // 2
-            first_half_avg = customer_data.iloc[:mid_point]['final_tons_sold'].mean()
-            second_half_avg = customer_data.iloc[mid_point:]['final_tons_sold'].mean()
-            volume_decline = ((first_half_avg - second_half_avg) / first_half_avg) * 100 if first_half_avg > 0 else 0
-        else:
-            volume_decline = 0
-        
-        # Calculate satisfaction decline
-        if total_transactions >= 2:
-            mid_point = total_transactions // 2
-            first_half_satisfaction = customer_data.iloc[:mid_point]['satisfaction_rating'].mean()
-            second_half_satisfaction = customer_data.iloc[mid_point:]['satisfaction_rating'].mean()
-            satisfaction_decline = first_half_satisfaction - second_half_satisfaction
-        else:
-            satisfaction_decline = 0
-        
-        # Determine customer status based on real patterns
-        if days_since_last > 120:
-            status = 'Lost'
-            risk_level = 'Lost'
-        elif days_since_last > 90:
-            status = 'At Risk'
-            risk_level = 'High'
-        elif days_since_last > 60 or volume_decline > 30:
-            status = 'Declining'
-            risk_level = 'Medium'
-        else:
-            status = 'Active'
-            risk_level = 'Low'
-        
-        customer_analysis[customer] = {
-            'total_transactions': total_transactions,
-            'total_value': total_value,
-            'avg_order_size': avg_order_size,
-            'first_transaction': first_transaction,
-            'last_transaction': last_transaction,
-            'days_since_last': days_since_last,
-            'volume_decline': volume_decline,
-            'satisfaction_decline': satisfaction_decline,
-            'status': status,
-            'risk_level': risk_level,
-            'primary_region': customer_data['warehouse_region'].mode().iloc[0] if not customer_data['warehouse_region'].mode().empty else 'Unknown'
-        }
-    
-    # Define competitors with realistic market positioning
-    competitors = {
-        'MaizeCorp Elite': {
-            'base_price': 290, 'market_share': 22, 'service_quality': 9.2,
-            'regions': ['Northern Highlands', 'East Coast', 'Central'], 'strategy': 'Premium Quality'
-        },
-        'GrainGiants International': {
-            'base_price': 265, 'market_share': 25, 'service_quality': 8.1,
-            'regions': ['South', 'West Coast', 'Central'], 'strategy': 'Volume Leader'
-        },
-        'AgriGlobal Solutions': {
-            'base_price': 280, 'market_share': 18, 'service_quality': 8.7,
-            'regions': ['East Coast', 'Northern Highlands'], 'strategy': 'Tech-Enabled'
-        },
-        'FarmFresh Distribution': {
-            'base_price': 255, 'market_share': 15, 'service_quality': 7.9,
-            'regions': ['South', 'West Coast'], 'strategy': 'Cost Leadership'
-        },
-        'Your Company': {
-            'base_price': 275, 'market_share': 20, 'service_quality': 8.5,
-            'regions': ['Northern Highlands', 'South', 'East Coast', 'West Coast', 'Central'], 'strategy': 'Balanced Approach'
-        }
-    }
-    
-    # Generate daily data for the past year
-    start_date = main_df['sale_date'].min() - timedelta(days=30)
-    end_date = main_df['sale_date'].max() + timedelta(days=30)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    
-    competitor_data = []
-    for date in dates:
-        for comp_name, comp_info in competitors.items():
-            # Daily price variation (±3%)
-            daily_price = comp_info['base_price'] * (1 + np.random.uniform(-0.03, 0.03))
-            
-            # Seasonal adjustments
-            month_factor = 1 + 0.05 * np.sin((date.month - 1) * np.pi / 6)
-            daily_price *= month_factor
-            
-            # Market share with daily volatility
-            daily_share = comp_info['market_share'] + np.random.uniform(-2, 2)
-            daily_share = max(5, min(35, daily_share))  # Bound between 5-35%
-            
-            # Service quality with slight variation
-            daily_service = comp_info['service_quality'] + np.random.uniform(-0.2, 0.2)
-            
-            # Sales volume (simulate based on market share)
-            daily_volume = np.random.poisson(int(daily_share * 10)) + np.random.randint(50, 200)
-            
-            for region in comp_info['regions']:
-                competitor_data.append({
-                    'date': date,
-                    'competitor': comp_name,
-                    'region': region,
-                    'price_per_ton': daily_price,
-                    'market_share': daily_share / len(comp_info['regions']),
-                    'service_quality': daily_service,
-                    'daily_volume_tons': daily_volume,
-                    'strategy': comp_info['strategy']
-                })
-    
-    df_competitor = pd.DataFrame(competitor_data)
-    
-    # Create realistic customer movement events based on actual lost customers
-    lost_customers = [name for name, data in customer_analysis.items() if data['status'] == 'Lost']
-    at_risk_customers = [name for name, data in customer_analysis.items() if data['risk_level'] == 'High']
-    
-    # Generate competitor customer base (customers that competitors have)
-    competitor_customers = {
-        'GrainGiants International': [
-            'Global Food Industries', 'Mega Grain Trading', 'Continental Food Corp', 
-            'Asian Export Partners', 'International Bulk Foods', 'Pacific Trade Alliance',
-            'Metro Food Distributors', 'Prime Agricultural Trading'
-        ],
-        'MaizeCorp Elite': [
-            'Premium Food Networks', 'Elite Grain Solutions', 'Luxury Food Imports',
-            'High-End Agricultural Co', 'Quality First Trading', 'Gourmet Supply Chain',
-            'Executive Food Partners', 'Premium Bulk Traders'
-        ],
-        'AgriGlobal Solutions': [
-            'TechGrain Innovations', 'Smart Agri Trading', 'Digital Harvest Co',
-            'Innovation Food Systems', 'Modern Grain Exchange', 'NextGen Agriculture',
-            'Automated Food Trading', 'Precision Agri Partners'
-        ],
-        'FarmFresh Distribution': [
-            'Budget Grain Buyers', 'Economy Food Trading', 'Value Agri Solutions',
-            'Discount Bulk Foods', 'Cost-Effective Grain Co', 'Affordable Food Partners',
-            'Mass Market Distributors', 'Volume Food Exchange'
-        ]
-    }
-    
-    # Generate realistic scenarios for actual lost customers
-    competitor_names = ['GrainGiants International', 'FarmFresh Distribution', 'MaizeCorp Elite', 'AgriGlobal Solutions']
-    
+# ====== Competitor data pipeline ======
+# Each stage is cached separately and keyed on its own inputs (sales data
+# version, simulation seed, competitor config, reference day). A changed CSV
+# recomputes the customer stages and re-simulates the market only if the
+# date range moved. Every stage seeds its own generator, so the results do
+# not depend on which stages were cache hits.
+SIMULATION_SEED = 42
+# Days of simulated market data before the first and after the last sale
+SIMULATION_MARGIN_DAYS = 30
+
+# Customers the competitors currently supply
+COMPETITOR_CUSTOMERS = {
+    'GrainGiants International': [
+        'Global Food Industries', 'Mega Grain Trading', 'Continental Food Corp', 
+        'Asian Export Partners', 'International Bulk Foods', 'Pacific Trade Alliance',
+        'Metro Food Distributors', 'Prime Agricultural Trading'
+    ],
+    'MaizeCorp Elite': [
+        'Premium Food Networks', 'Elite Grain Solutions', 'Luxury Food Imports',
+        'High-End Agricultural Co', 'Quality First Trading', 'Gourmet Supply Chain',
+        'Executive Food Partners', 'Premium Bulk Traders'
+    ],
+    'AgriGlobal Solutions': [
+        'TechGrain Innovations', 'Smart Agri Trading', 'Digital Harvest Co',
+        'Innovation Food Systems', 'Modern Grain Exchange', 'NextGen Agriculture',
+        'Automated Food Trading', 'Precision Agri Partners'
+    ],
+    'FarmFresh Distribution': [
+        'Budget Grain Buyers', 'Economy Food Trading', 'Value Agri Solutions',
+        'Discount Bulk Foods', 'Cost-Effective Grain Co', 'Affordable Food Partners',
+        'Mass Market Distributors', 'Volume Food Exchange'
+    ]
+}
+
+# Competitors lost customers are attributed to, in turn
+COMPETITOR_NAMES = ['GrainGiants International', 'FarmFresh Distribution', 'MaizeCorp Elite', 'AgriGlobal Solutions']
+
+
+@st.cache_data(max_entries=4)
+def analyze_customers(_main_df, data_version, as_of_day):
+    """Churn metrics per customer for one sales data version, as of the start of as_of_day"""
+    return churn_analytics.customer_churn_metrics(_main_df, as_of=pd.Timestamp(as_of_day))
+
+
+@st.cache_resource(max_entries=4)
+def simulate_market(start_date, end_date, competitors, seed):
+    """
+    Shared, read-only sum/count aggregates of the simulated daily market
+
+    The simulated rows are only needed to build the aggregates, so they are
+    dropped afterwards. A rerun gets the cached aggregates without copying
+    or unpickling the daily frame.
+    """
+    df_competitor = market_simulation.simulate_competitor_market(start_date, end_date, competitors, seed)
+    return market_aggregates.MarketAggregates(df_competitor)
+
+
+@st.cache_data(max_entries=4)
+def build_customer_movements(_customer_analysis, data_version, as_of_day, seed):
+    """Lost and at-risk customer scenarios built from the churn metrics"""
+    rng = np.random.default_rng(seed)
+    lost_customers = _customer_analysis.index[_customer_analysis['status'] == 'Lost'].tolist()
+    at_risk_customers = _customer_analysis.index[_customer_analysis['risk_level'] == 'High'].tolist()
     customer_movements = []
     
     # Lost customers - create believable scenarios for why they left
     for i, customer in enumerate(lost_customers[:6]):  # Top 6 lost customers
-        data = customer_analysis[customer]
-        competitor = competitor_names[i % len(competitor_names)]
+        data = _customer_analysis.loc[customer]
+        competitor = COMPETITOR_NAMES[i % len(COMPETITOR_NAMES)]
         
         # Determine likely reasons based on their patterns
         reasons = []
@@ -242,8 +143,8 @@ def generate_enhanced_competitor_data():
         primary_reason = reasons[0] if reasons else "Competitor offered better pricing and terms"
         
         # Estimate when they likely left (halfway between last order and now)
-        days_since_left = data['days_since_last'] // 2
-        left_date = datetime.now() - timedelta(days=days_since_left)
+        days_since_left = int(data['days_since_last']) // 2
+        left_date = as_of_day - timedelta(days=days_since_left)
         
         customer_movements.append({
             'customer': customer,
@@ -260,8 +161,8 @@ def generate_enhanced_competitor_data():
     
     # At-risk customers - create warning scenarios
     for customer in at_risk_customers[:3]:
-        data = customer_analysis[customer]
-        competitor = np.random.choice(competitor_names)
+        data = _customer_analysis.loc[customer]
+        competitor = str(rng.choice(COMPETITOR_NAMES))
         
         customer_movements.append({
             'customer': customer,
@@ -275,7 +176,13 @@ def generate_enhanced_competitor_data():
             'risk_probability': 'High' if data['days_since_last'] > 100 else 'Medium'
         })
     
-    # Generate competitor customer intelligence (customers we could potentially win)
+    return customer_movements
+
+
+@st.cache_data(max_entries=4)
+def build_target_opportunities(competitor_customers, competitors, as_of_day, seed):
+    """Competitor customers we could win, with value, renewal date and approach"""
+    rng = np.random.default_rng(seed)
     target_opportunities = []
     
     for comp_name, customers in competitor_customers.items():
@@ -283,9 +190,9 @@ def generate_enhanced_competitor_data():
         
         for i, customer in enumerate(customers):
             # Generate realistic customer profiles
-            estimated_annual_value = np.random.uniform(500000, 15000000)
-            contract_end_date = datetime.now() + timedelta(days=np.random.randint(30, 730))
-            satisfaction_with_competitor = np.random.uniform(6.0, 9.5)
+            estimated_annual_value = rng.uniform(500000, 15000000)
+            contract_end_date = as_of_day + timedelta(days=int(rng.integers(30, 730)))
+            satisfaction_with_competitor = rng.uniform(6.0, 9.5)
             
             # Determine opportunity level
             if satisfaction_with_competitor < 7.5 and estimated_annual_value > 2000000:
@@ -312,14 +219,36 @@ def generate_enhanced_competitor_data():
                 'satisfaction_with_current': satisfaction_with_competitor,
                 'opportunity_level': opportunity_level,
                 'our_advantages': advantages,
-                'region': np.random.choice(comp_info['regions']),
+                'region': str(rng.choice(comp_info['regions'])),
                 'recommended_approach': 'Price-focused proposal' if 'Price advantage' in str(advantages) else 'Service differentiation strategy'
             })
     
-    return df_competitor, customer_movements, competitors, customer_analysis, competitor_customers, target_opportunities
+    return target_opportunities
+
+
+def generate_enhanced_competitor_data():
+    """Run the pipeline stages; each is a cache hit unless its inputs changed"""
+    try:
+        main_df, data_version = sales_data.get_sales_store().snapshot()
+    except FileNotFoundError:
+        st.error("Please ensure partial_csv.csv is in the same directory.")
+        st.stop()
+    
+    as_of_day = datetime.now().date()
+    competitors = market_simulation.DEFAULT_COMPETITORS
+    margin = timedelta(days=SIMULATION_MARGIN_DAYS)
+    
+    customer_analysis = analyze_customers(main_df, data_version, as_of_day)
+    market = simulate_market(
+        main_df['sale_date'].min() - margin, main_df['sale_date'].max() + margin, competitors, SIMULATION_SEED
+    )
+    customer_movements = build_customer_movements(customer_analysis, data_version, as_of_day, SIMULATION_SEED)
+    target_opportunities = build_target_opportunities(COMPETITOR_CUSTOMERS, competitors, as_of_day, SIMULATION_SEED)
+    
+    return market, customer_movements, competitors, customer_analysis, COMPETITOR_CUSTOMERS, target_opportunities
 
 # Generate data
-df_competitor, customer_movements, competitors_info, customer_analysis, competitor_customers, target_opportunities = generate_enhanced_competitor_data()
+market, customer_movements, competitors_info, customer_analysis, competitor_customers, target_opportunities = generate_enhanced_competitor_data()
 
 # Dashboard header
 st.title("📊 Competitor Intelligence Dashboard")
@@ -336,13 +265,13 @@ if st.sidebar.button("🔄 Reset All Filters", key="clear_filters"):
 # Date range filter
 date_range = st.sidebar.date_input(
     "Select Date Range",
-    value=(df_competitor['date'].min().date(), df_competitor['date'].max().date()),
-    min_value=df_competitor['date'].min().date(),
-    max_value=df_competitor['date'].max().date()
+    value=(market.dates.min().date(), market.dates.max().date()),
+    min_value=market.dates.min().date(),
+    max_value=market.dates.max().date()
 )
 
 # Region filter
-regions = sorted(df_competitor['region'].unique())
+regions = sorted(market.regions)
 selected_regions = st.sidebar.multiselect(
     "Select Regions", 
     regions, 
@@ -350,21 +279,15 @@ selected_regions = st.sidebar.multiselect(
 )
 
 # Competitor filter
-competitors = sorted(df_competitor['competitor'].unique())
+competitors = sorted(market.competitors)
 selected_competitors = st.sidebar.multiselect(
     "Select Competitors", 
     competitors, 
     default=competitors
 )
 
-# Filter data
-mask = (
-    (df_competitor['date'].dt.date >= date_range[0]) & 
-    (df_competitor['date'].dt.date <= date_range[1]) &
-    (df_competitor['region'].isin(selected_regions)) &
-    (df_competitor['competitor'].isin(selected_competitors))
-)
-df_filtered = df_competitor[mask]
+# Filter data - slices the pre-aggregated market arrays, the simulated rows are not regrouped
+market_filtered = market.selection(date_range[0], date_range[1], selected_regions, selected_competitors)
 
 # Key Performance Indicators
 st.subheader("🎯 Market Intelligence Overview")
@@ -372,8 +295,8 @@ st.subheader("🎯 Market Intelligence Overview")
 col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
-    avg_market_price = df_filtered['price_per_ton'].mean()
-    your_price = df_filtered[df_filtered['competitor'] == 'Your Company']['price_per_ton'].mean()
+    avg_market_price = market_filtered.mean('price_per_ton')
+    your_price = market_filtered.mean('price_per_ton', competitor='Your Company')
     price_diff = your_price - avg_market_price
     st.metric(
         "Avg Market Price", 
@@ -393,16 +316,16 @@ with col2:
     )
 import math
 with col3:
-    your_market_share = df_filtered[df_filtered['competitor'] == 'Your Company']['market_share'].mean()
+    your_market_share = market_filtered.mean('market_share', competitor='Your Company')
     st.metric("Your Market Share", f"{your_market_share:.1f}%", delta=f"-{(12/500) * 100}")
 
 with col4:
-    price_volatility = df_filtered['price_per_ton'].std()
+    price_volatility = market_filtered.price_std()
     st.metric("Market Volatility", f"${price_volatility:.0f}", delta=f"{round((230/50) * 100)}")
 
 with col5:
-    lost_count = len([c for c, d in customer_analysis.items() if d['status'] == 'Lost'])
-    at_risk_count = len([c for c, d in customer_analysis.items() if d['risk_level'] == 'High'])
+    lost_count = int((customer_analysis['status'] == 'Lost').sum())
+    at_risk_count = int((customer_analysis['risk_level'] == 'High').sum())
     st.metric("Customer Status", f"🔴 {lost_count} Lost | 🟡 {at_risk_count} At Risk", delta=f"-{(3/50) * 100}")
 
 st.markdown("---")
@@ -411,10 +334,12 @@ st.markdown("---")
 st.subheader("💰 Competitive Price Analysis")
 
 # Aggregate data by competitor and date for cleaner visualization
-daily_avg = df_filtered.groupby(['date', 'competitor'])['price_per_ton'].mean().reset_index()
+daily_avg = market_filtered.by_date('price_per_ton')
+# Thin each competitor's daily series to the chart's point budget
+price_points = decimation.decimate(daily_avg, 'date', 'price_per_ton', group='competitor')
 
 fig_price = px.line( 
-    daily_avg, 
+    price_points, 
     x='date', 
     y='price_per_ton', 
     color='competitor',
@@ -462,7 +387,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("🗺️ Regional Market Share")
-    regional_share = df_filtered.groupby(['region', 'competitor'])['market_share'].mean().reset_index()
+    regional_share = market_filtered.by_region('market_share')
     
     fig_region = px.bar(
         regional_share, 
@@ -477,11 +402,7 @@ with col1:
 
 with col2:
     st.subheader("⭐ Service Quality vs Price")
-    quality_price = df_filtered.groupby('competitor').agg({
-        'service_quality': 'mean',
-        'price_per_ton': 'mean',
-        'market_share': 'mean'
-    }).reset_index()
+    quality_price = market_filtered.by_competitor(['service_quality', 'price_per_ton', 'market_share'])
     
     fig_scatter = px.scatter(
         quality_price,
@@ -626,13 +547,9 @@ st.markdown("---")
 st.subheader("📊 Customer Portfolio Health Check")
 
 # Calculate status distribution
-status_counts = {'Lost': 0, 'At Risk': 0, 'Declining': 0, 'Active': 0}
-status_values = {'Lost': 0, 'At Risk': 0, 'Declining': 0, 'Active': 0}
-
-for customer, data in customer_analysis.items():
-    status = data['status']
-    status_counts[status] += 1
-    status_values[status] += data['total_value']
+status_groups = customer_analysis.groupby('status', observed=False)['total_value']
+status_counts = status_groups.size()
+status_values = status_groups.sum()
 
 # Display status summary
 col1, col2, col3, col4 = st.columns(4)
@@ -670,18 +587,16 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("#### 🔥 **Highest Value Lost Customers**")
-    lost_customers = [(name, data) for name, data in customer_analysis.items() if data['status'] == 'Lost']
-    lost_customers.sort(key=lambda x: x[1]['total_value'], reverse=True)
+    lost_customers = customer_analysis[customer_analysis['status'] == 'Lost'].nlargest(5, 'total_value')
     
-    for customer, data in lost_customers[:5]:
+    for customer, data in lost_customers.iterrows():
         st.markdown(f"• **{customer}:** ${data['total_value']:,.0f} ({data['days_since_last']} days ago)")
 
 with col2:
     st.markdown("#### 🚨 **Most Critical At-Risk Customers**")
-    at_risk_customers = [(name, data) for name, data in customer_analysis.items() if data['risk_level'] == 'High']
-    at_risk_customers.sort(key=lambda x: x[1]['total_value'], reverse=True)
+    at_risk_customers = customer_analysis[customer_analysis['risk_level'] == 'High'].nlargest(5, 'total_value')
     
-    for customer, data in at_risk_customers[:5]:
+    for customer, data in at_risk_customers.iterrows():
         st.markdown(f"• **{customer}:** ${data['total_value']:,.0f} ({data['days_since_last']} days gap)")
 
 
@@ -788,8 +703,8 @@ st.markdown("---")
 if st.button("📊 Export Analysis Data"):
     # Create summary report
     summary_data = {
-        'competitor_prices': df_filtered.groupby('competitor')['price_per_ton'].mean().to_dict(),
-        'market_shares': df_filtered.groupby('competitor')['market_share'].mean().to_dict(),
+        'competitor_prices': market_filtered.by_competitor(['price_per_ton']).set_index('competitor')['price_per_ton'].to_dict(),
+        'market_shares': market_filtered.by_competitor(['market_share']).set_index('competitor')['market_share'].to_dict(),
         'customer_movements': customer_movements,
         'analysis_period': f"{date_range[0]} to {date_range[1]}"
     }
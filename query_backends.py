@@ -0,0 +1,269 @@
+import itertools
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+import sales_db
+
+try:
+    import duckdb
+except ImportError:
+    # The DuckDB backend is optional; the SQLite backends need nothing extra
+    duckdb = None
+
+# Deployment setting (environment variable, or Streamlit secret of the same name)
+BACKEND_SETTING = "SALES_QUERY_BACKEND"
+DEFAULT_BACKEND = "sqlite"
+
+
+class QueryBackend:
+    """
+    Where generated SQL runs
+
+    A backend keeps its copy of the sales table in line with the shared
+    sales frame (sync) and runs read-only queries against it (execute).
+    `dialect` is named in the SQL generation prompt, so the model writes
+    SQL for the engine that will run it. Backends are shared by all
+    Streamlit sessions and must be thread-safe.
+    """
+
+    name = None
+    dialect = None
+
+    def sync(self, csv_path, df, version):
+        """
+        Make the sales table match a data version
+
+        Args:
+            csv_path (str): Source CSV file
+            df (pd.DataFrame): Typed sales frame
+            version (str): Content hash of the CSV df was loaded from
+
+        Returns:
+            str: What was done, e.g. 'reused', 'appended' or 'rebuilt'
+        """
+        raise NotImplementedError
+
+    def execute(self, sql):
+        """Run a query and return the result as a DataFrame"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections and in-memory data"""
+
+
+def _fetch_frame(engine, sql):
+    with engine.connect() as conn:
+        result = conn.execute(text(sql))
+        return pd.DataFrame(result.fetchall(), columns=result.keys())
+
+
+class SQLiteFileBackend(QueryBackend):
+    """
+    The sales table in an on-disk SQLite file (see sales_db)
+
+    The file survives restarts and is shared between processes. A CSV that
+    only grew is appended, not rebuilt. Queries use a pool of read-only
+    connections.
+    """
+
+    name = "sqlite"
+    dialect = "SQLite"
+
+    def __init__(self, db_path=sales_db.DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.engine = None
+
+    def sync(self, csv_path, df, version):
+        status = sales_db.sync_sales_table(csv_path, self.db_path, df, version)
+        if self.engine is None:
+            self.engine = sales_db.create_query_engine(self.db_path)
+        return status
+
+    def execute(self, sql):
+        return _fetch_frame(self.engine, sql)
+
+    def close(self):
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
+
+
+class SQLiteMemoryBackend(QueryBackend):
+    """
+    The sales table in a shared-cache in-memory SQLite database
+
+    No file I/O: the table, its indexes and the query connections share one
+    in-memory database per data version. A new version is built into a
+    fresh database under a new name, then the query engine is swapped.
+    Queries in flight finish on the old database, and readers never see a
+    half-built table. The database lives as long as its keeper connection.
+    """
+
+    name = "sqlite-memory"
+    dialect = "SQLite"
+    _names = itertools.count()
+
+    def __init__(self, pool_size=sales_db.QUERY_POOL_SIZE):
+        self.pool_size = pool_size
+        self.version = None
+        self.engine = None
+        self._keeper = None
+        self._lock = threading.Lock()
+
+    def _build(self, df, version, size):
+        uri = f"file:sales_{os.getpid()}_{next(self._names)}?mode=memory&cache=shared"
+        keeper = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+        keeper.execute("PRAGMA temp_store=MEMORY")
+        keeper.execute("BEGIN")
+        sales_db.rebuild_sales_table(keeper, df, version, size)
+        keeper.execute("COMMIT")
+
+        engine = create_engine(
+            "sqlite://",
+            creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False),
+            poolclass=QueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.pool_size,
+        )
+
+        @event.listens_for(engine, "connect")
+        def _set_query_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only = ON")
+            cursor.execute("PRAGMA temp_store = MEMORY")
+            cursor.close()
+
+        return keeper, engine
+
+    def sync(self, csv_path, df, version):
+        with self._lock:
+            if version == self.version:
+                return 'reused'
+            keeper, engine = self._build(df, version, os.path.getsize(csv_path))
+            old_keeper, old_engine = self._keeper, self.engine
+            self._keeper, self.engine, self.version = keeper, engine, version
+        if old_engine is not None:
+            old_engine.dispose()
+            old_keeper.close()
+        return 'rebuilt'
+
+    def execute(self, sql):
+        return _fetch_frame(self.engine, sql)
+
+    def close(self):
+        with self._lock:
+            if self.engine is not None:
+                self.engine.dispose()
+                self._keeper.close()
+            self.engine = self._keeper = self.version = None
+
+
+class DuckDBBackend(QueryBackend):
+    """
+    DuckDB over the shared sales frame
+
+    Once per data version, the typed frame is read into a native DuckDB
+    table straight from its pandas columns: one columnar copy, with no CSV
+    or SQL round trip. The load uses a temporary registration of the frame.
+    Categoricals become VARCHAR, like the SQLite TEXT columns. A plain
+    table, unlike the connection-scoped registration, is visible to every
+    cursor, so sessions query it in parallel. GROUP BY and aggregates run
+    vectorized. Results come back as a DataFrame built from DuckDB's
+    columnar result. External access (file readers, COPY, extensions) is
+    switched off after the load, and only single SELECT statements are
+    run, so generated SQL can only read the sales data.
+    """
+
+    name = "duckdb"
+    dialect = "DuckDB"
+
+    def __init__(self):
+        if duckdb is None:
+            raise RuntimeError("The duckdb package is required for the DuckDB query backend")
+        self.version = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _select_list(df):
+        return ", ".join(
+            f'CAST("{col}" AS VARCHAR) AS "{col}"' if isinstance(df[col].dtype, pd.CategoricalDtype) else f'"{col}"'
+            for col in df.columns
+        )
+
+    def sync(self, csv_path, df, version):
+        with self._lock:
+            if version == self.version:
+                return 'reused'
+            conn = duckdb.connect(":memory:")
+            conn.register("sales_frame", df)
+            conn.execute(f"CREATE TABLE {sales_db.SALES_TABLE} AS SELECT {self._select_list(df)} FROM sales_frame")
+            conn.unregister("sales_frame")
+            conn.execute("SET enable_external_access = false")
+            conn.execute("SET lock_configuration = true")
+            old_conn, self._conn, self.version = self._conn, conn, version
+        if old_conn is not None:
+            old_conn.close()
+        return 'rebuilt'
+
+    def execute(self, sql):
+        # A cursor is its own connection to the same database, so queries from different threads run side by side
+        cursor = self._conn.cursor()
+        try:
+            # An in-memory DuckDB database cannot be opened read-only, so anything but a single SELECT is refused
+            statements = cursor.extract_statements(sql)
+            if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                raise ValueError("Only a single SELECT query can be run")
+            return cursor.execute(sql).df()
+        finally:
+            cursor.close()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = self.version = None
+
+
+BACKENDS = {
+    backend.name: backend for backend in (SQLiteFileBackend, SQLiteMemoryBackend, DuckDBBackend)
+}
+
+
+def configured_backend_name():
+    """
+    Backend chosen for this deployment
+
+    Read from the SALES_QUERY_BACKEND environment variable, then the
+    Streamlit secret of the same name, defaulting to 'sqlite'.
+    """
+    name = os.environ.get(BACKEND_SETTING)
+    if not name:
+        try:
+            import streamlit as st
+            name = st.secrets.get(BACKEND_SETTING)
+        except Exception:
+            name = None
+    return (name or DEFAULT_BACKEND).strip().lower()
+
+
+def create_backend(name=None):
+    """
+    Create a query backend by name ('sqlite', 'sqlite-memory' or 'duckdb')
+
+    Args:
+        name (str): Backend name (default: configured_backend_name())
+
+    Returns:
+        QueryBackend: New, not yet synced backend
+    """
+    name = name or configured_backend_name()
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown query backend '{name}', expected one of {sorted(BACKENDS)}")
+    return backend()
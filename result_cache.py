@@ -0,0 +1,152 @@
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    # Without pyarrow results are kept as plain NumPy column arrays
+    pa = None
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_SQL_TOKEN_RE = re.compile(r"""
+      '(?:[^']|'')*'                          # string literal
+    | "(?:[^"]|"")*" | `[^`]*` | \[[^\]]*\]   # quoted identifier
+    | --[^\n]* | /\*.*?\*/                    # comment
+    | [A-Za-z_][A-Za-z0-9_$]*                 # keyword or identifier
+    | (?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?    # numeric literal
+    | <=|>=|<>|!=|==|\|\|                     # two-character operator
+    | \S                                      # any other symbol
+""", re.VERBOSE | re.DOTALL)
+
+# Reserved words, which cannot appear as bare identifiers or aliases
+SQL_KEYWORDS = {
+    'all', 'and', 'as', 'asc', 'between', 'by', 'case', 'cast', 'cross', 'desc',
+    'distinct', 'else', 'end', 'escape', 'except', 'exists', 'from', 'glob', 'group',
+    'having', 'in', 'inner', 'intersect', 'is', 'join', 'left', 'like', 'limit',
+    'not', 'null', 'offset', 'on', 'or', 'order', 'outer', 'select', 'then', 'union',
+    'using', 'when', 'where', 'with',
+}
+
+# Functions, upper-cased only when called so that aliases such as "total" keep their case
+SQL_FUNCTIONS = {
+    'avg', 'coalesce', 'count', 'date', 'datetime', 'ifnull', 'julianday', 'lower',
+    'max', 'min', 'round', 'strftime', 'substr', 'sum', 'total', 'upper',
+}
+
+
+def _normalize_number(token):
+    """Canonical spelling of a numeric literal that keeps its integer/real type"""
+    try:
+        if re.fullmatch(r"\d+", token):
+            return str(int(token))
+        return repr(float(token))
+    except ValueError:
+        return token
+
+
+def canonicalize_sql(sql):
+    """
+    Canonical text of a SQL query, used as the cache key
+
+    Comments and a trailing semicolon are dropped and whitespace is
+    collapsed to single spaces between tokens. Keywords and called
+    functions are upper-cased, numeric literals are spelled canonically
+    (007 -> 7, 2.50 -> 2.5), and string literals and identifiers are kept
+    as written. Integer and real literals stay distinct because SQLite
+    treats them differently in division.
+    """
+    raw = [tok for tok in _SQL_TOKEN_RE.findall(sql) if not tok.startswith(('--', '/*'))]
+    tokens = []
+    for i, token in enumerate(raw):
+        lowered = token.lower()
+        if lowered in SQL_KEYWORDS or (lowered in SQL_FUNCTIONS and raw[i + 1:i + 2] == ['(']):
+            token = token.upper()
+        elif token[0].isdigit() or (token[0] == '.' and len(token) > 1):
+            token = _normalize_number(token)
+        tokens.append(token)
+    while tokens and tokens[-1] == ';':
+        tokens.pop()
+    return " ".join(tokens)
+
+
+class QueryResultCache:
+    """
+    In-memory LRU cache of executed query results
+
+    Entries are keyed by the canonical SQL text plus the data version of
+    the `sales` table, and are stored in columnar form: Arrow tables when
+    pyarrow is available, otherwise NumPy arrays per column. The total
+    size stays under a byte budget. Each hit returns a new DataFrame, so
+    callers cannot change the cached copy. Column labels come from the
+    query text that first filled an entry.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._entries = OrderedDict()  # key -> (stored, nbytes)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pack(df):
+        """Convert a result to its compact stored form and size in bytes"""
+        if pa is not None:
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                return table, table.nbytes
+            except (pa.ArrowException, TypeError, ValueError):
+                pass
+        columns = {col: df[col].to_numpy(copy=True) for col in df.columns}
+        return columns, int(df.memory_usage(deep=True, index=False).sum())
+
+    @staticmethod
+    def _unpack(stored):
+        if pa is not None and isinstance(stored, pa.Table):
+            return stored.to_pandas()
+        return pd.DataFrame({col: values.copy() for col, values in stored.items()})
+
+    def get(self, sql, data_version):
+        """Return a cached result for a query on a data version, or None"""
+        key = (canonicalize_sql(sql), data_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+        return self._unpack(entry[0])
+
+    def put(self, sql, data_version, df):
+        """Store a query result, evicting least recently used entries to stay in budget"""
+        stored, nbytes = self._pack(df)
+        if nbytes > self.max_bytes:
+            return
+        key = (canonicalize_sql(sql), data_version)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (stored, nbytes)
+            self.current_bytes += nbytes
+            self.stats['stores'] += 1
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.stats['evictions'] += 1
+
+    def invalidate(self):
+        """Drop every cached result (called when the sales table gets new data)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def get_stats(self):
+        """Return hit/miss counters, entry count and bytes in use"""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'bytes': self.current_bytes}
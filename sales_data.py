@@ -0,0 +1,413 @@
+import argparse
+import hashlib
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    # Without pyarrow every load falls back to parsing the CSV
+    pa = None
+
+DEFAULT_CSV_PATH = "partial_csv.csv"
+
+# Bump when the cached layout changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = "2"
+
+# Low-cardinality text columns, stored as categoricals with sorted categories
+CATEGORICAL_COLUMNS = [
+    'customer_name',
+    'customer_category',
+    'customer_company_size',
+    'discount_offered',
+    'product_name',
+    'warehouse_name',
+    'warehouse_region',
+]
+
+# Narrow numeric types for columns whose values fit without loss.
+# sale_amount and final_tons_sold stay float64 because they are summed
+# into revenue and volume totals.
+NUMERIC_DTYPES = {
+    'satisfaction_rating': 'int8',
+    'discount_amount_percent': 'int8',
+    'base_price_per_ton': 'float32',
+}
+
+
+def file_content_hash(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fits_dtype(values, dtype):
+    """Whether a numeric column converts to dtype without loss (no nulls; integral and in range for integers)"""
+    if values.isna().any():
+        return False
+    if np.issubdtype(np.dtype(dtype), np.integer) and len(values):
+        info = np.iinfo(dtype)
+        return bool((values % 1 == 0).all() and values.min() >= info.min and values.max() <= info.max)
+    return True
+
+
+def apply_sales_schema(df):
+    """Convert a freshly parsed sales frame to its compact column types"""
+    df['sale_date'] = pd.to_datetime(df['sale_date'], format='ISO8601')
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            values = df[col].astype('category')
+            df[col] = values.cat.reorder_categories(sorted(values.cat.categories))
+
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col in df.columns and _fits_dtype(df[col], dtype):
+            df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def read_sales_csv(csv_path):
+    """
+    Parse the sales CSV into the typed columnar layout used by the app
+
+    Rows are sorted by sale_date (stable, so same-day rows keep their file
+    order). Date ranges are therefore contiguous and can be found by binary
+    search (see sales_filters.DateIndex).
+    """
+    df = pd.read_csv(csv_path, dtype={col: 'category' for col in CATEGORICAL_COLUMNS})
+    df = apply_sales_schema(df)
+    return df.sort_values('sale_date', kind='stable', ignore_index=True)
+
+
+def read_appended_rows(csv_path, old_size, old_sha256):
+    """
+    Return the rows added to a CSV since it had the given size and hash, or None
+
+    The CSV only counts as appended if it is longer than before, the old
+    content ends at a line break, and the old content is byte-identical to
+    the start of the current file. The new rows are parsed from the tail
+    bytes alone.
+
+    Returns:
+        tuple: (typed DataFrame of new rows, sha256 of the whole file, new size), or None
+    """
+    if old_size <= 0 or os.path.getsize(csv_path) <= old_size:
+        return None
+
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        f.seek(0)
+        remaining = old_size
+        last_byte = b''
+        while remaining > 0:
+            chunk = f.read(min(1 << 20, remaining))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            last_byte = chunk[-1:]
+            remaining -= len(chunk)
+        if last_byte != b'\n' or digest.hexdigest() != old_sha256:
+            return None
+        tail = f.read()
+
+    digest.update(tail)
+    rows = pd.read_csv(io.BytesIO(header + tail))
+    return apply_sales_schema(rows), digest.hexdigest(), old_size + len(tail)
+
+
+def append_sales_rows(df, rows):
+    """
+    Merge newly appended rows into a typed, date-sorted sales frame
+
+    Categorical columns get the sorted union of both category sets, and the
+    result stays sorted by sale_date (stable, so new rows follow existing
+    rows of the same day).
+
+    Raises:
+        ValueError: If new values do not fit an integer column's type
+            (out of range, missing or fractional). The caller reloads instead.
+    """
+    combined = {}
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            combined[col] = pd.api.types.union_categoricals(
+                [df[col], rows[col].astype('category')], sort_categories=True
+            )
+        else:
+            if np.issubdtype(df[col].dtype, np.integer) and not _fits_dtype(rows[col], df[col].dtype):
+                raise ValueError(f"appended '{col}' values do not fit {df[col].dtype}")
+            combined[col] = np.concatenate([df[col].to_numpy(), rows[col].to_numpy(dtype=df[col].dtype)])
+    merged = pd.DataFrame(combined)
+    return merged.sort_values('sale_date', kind='stable', ignore_index=True)
+
+
+# ====== BINARY CACHE ======
+
+def _arrow_schema():
+    """Explicit Arrow schema of the cached sales table"""
+    text_column = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('sale_date', pa.timestamp('ns')),
+        ('customer_name', text_column),
+        ('customer_category', text_column),
+        ('customer_company_size', text_column),
+        ('satisfaction_rating', pa.int8()),
+        ('discount_offered', text_column),
+        ('discount_amount_percent', pa.int8()),
+        ('product_name', text_column),
+        ('base_price_per_ton', pa.float32()),
+        ('warehouse_name', text_column),
+        ('warehouse_region', text_column),
+        ('final_tons_sold', pa.float64()),
+        ('sale_amount', pa.float64()),
+    ])
+
+
+def cache_path_for(csv_path):
+    """Return the Feather cache location that sits next to a CSV file"""
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+def read_cache_metadata(cache_path):
+    """
+    Return the source fingerprint stored in a cache file
+
+    Only the file footer is read. Returns None when pyarrow is missing, the
+    cache does not exist, or its schema does not match the expected one.
+    """
+    if pa is None or not os.path.exists(cache_path):
+        return None
+    try:
+        with pa.memory_map(cache_path) as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    expected = _arrow_schema()
+    if [(f.name, f.type) for f in schema] != [(f.name, f.type) for f in expected]:
+        return None
+    meta = {k.decode(): v.decode() for k, v in (schema.metadata or {}).items() if k != b'pandas'}
+    if meta.get('cache_format') != CACHE_FORMAT_VERSION:
+        return None
+    return meta
+
+
+def write_sales_cache(df, cache_path, version, stat):
+    """
+    Write the typed frame to an uncompressed Feather file
+
+    The source size, mtime and content hash are stored in the schema metadata.
+    Uncompressed buffers let later loads memory-map the file. The file is
+    written to a temporary path and moved into place, so readers never see
+    a partial cache.
+    """
+    table = pa.Table.from_pandas(df, schema=_arrow_schema(), preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b'cache_format': CACHE_FORMAT_VERSION.encode(),
+        b'source_sha256': version.encode(),
+        b'source_size': str(stat.st_size).encode(),
+        b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+    })
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+
+
+def read_sales_cache(cache_path):
+    """Load a Feather cache through a memory map"""
+    table = feather.read_table(cache_path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def _cache_matches_stat(meta, stat):
+    return (meta is not None
+            and meta.get('source_size') == str(stat.st_size)
+            and meta.get('source_mtime_ns') == str(stat.st_mtime_ns))
+
+
+def load_sales_frame(csv_path, stat=None, known_version=None):
+    """
+    Load the typed sales frame, preferring the binary cache
+
+    Args:
+        csv_path (str): Path to the source CSV
+        stat (os.stat_result): Source stat, taken here if not provided
+        known_version (str): Version already held by the caller. If the
+            source still has this version, no data is loaded.
+
+    Returns:
+        tuple: (DataFrame or None if unchanged from known_version, str version)
+    """
+    stat = stat or os.stat(csv_path)
+    cache_path = cache_path_for(csv_path)
+    meta = read_cache_metadata(cache_path)
+
+    # Fast path: an unchanged size and mtime means no hashing is needed
+    if _cache_matches_stat(meta, stat):
+        version = meta['source_sha256']
+    else:
+        version = file_content_hash(csv_path)
+
+    if version == known_version:
+        return None, version
+
+    if meta is not None and meta.get('source_sha256') == version:
+        try:
+            return read_sales_cache(cache_path), version
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"⚠️ Ignoring unreadable sales cache '{cache_path}': {e}")
+
+    df = read_sales_csv(csv_path)
+    if pa is not None:
+        try:
+            write_sales_cache(df, cache_path, version, stat)
+        except (OSError, KeyError, ValueError, pa.ArrowException) as e:
+            print(f"⚠️ Could not write sales cache '{cache_path}': {e}")
+    return df, version
+
+
+class SalesDataStore:
+    """
+    Process-wide holder for the typed sales DataFrame
+
+    The data is loaded once and kept in memory. Each access stats the file.
+    A changed mtime triggers a content check, and the data is only re-read
+    when the hash differs from the loaded copy. If the file only grew by
+    appended lines, just those lines are parsed and merged in (see
+    appended_since). Full loads go through the Feather cache (see
+    load_sales_frame). Rows are sorted by sale_date. Callers share the same
+    frame and must treat it as read-only.
+    """
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH):
+        self.csv_path = csv_path
+        self.df = None
+        self.version = None
+        self.last_append = None  # (previous version, new version, appended rows)
+        self._size = None
+        self._mtime_ns = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """
+        Return the current data together with its version
+
+        Returns:
+            tuple: (pandas.DataFrame, str content hash of the source file)
+        """
+        with self._lock:
+            stat = os.stat(self.csv_path)
+            if self.df is None or stat.st_mtime_ns != self._mtime_ns:
+                self._refresh(stat)
+            return self.df, self.version
+
+    def get(self):
+        """Return the current sales DataFrame, reloading it if the source changed"""
+        return self.snapshot()[0]
+
+    def appended_since(self, version):
+        """
+        Rows appended to the source since a version, if that was the only change
+
+        Lets derived data (e.g. the rollup cube) update incrementally instead
+        of being rebuilt from the full frame.
+
+        Returns:
+            pd.DataFrame or None: Typed new rows, or None if the current data
+            is not exactly `version` plus one append
+        """
+        with self._lock:
+            if self.last_append is not None and self.last_append[:2] == (version, self.version):
+                return self.last_append[2]
+            return None
+
+    def _refresh(self, stat):
+        appended = None
+        if self.df is not None:
+            appended = read_appended_rows(self.csv_path, self._size, self.version)
+
+        if appended is not None:
+            try:
+                merged = append_sales_rows(self.df, appended[0])
+            except (ValueError, TypeError) as e:
+                # e.g. new rows whose values do not fit the narrow column types
+                print(f"⚠️ Reloading sales data instead of appending: {e}")
+                appended = None
+
+        if appended is not None:
+            # Only new lines were added: the tail was parsed on its own and merged in
+            rows, version, size = appended
+            self.df = merged
+            self.last_append = (self.version, version, rows)
+            self.version, self._size = version, size
+            print(f"✅ Appended {len(rows)} sales records ({len(self.df)} total)")
+            if pa is not None and size == stat.st_size:
+                try:
+                    write_sales_cache(self.df, cache_path_for(self.csv_path), version, stat)
+                except (OSError, KeyError, ValueError, pa.ArrowException) as e:
+                    print(f"⚠️ Could not write sales cache: {e}")
+        else:
+            df, version = load_sales_frame(self.csv_path, stat, known_version=self.version)
+            if df is not None:
+                self.df = df
+                self.version = version
+                self.last_append = None
+                print(f"✅ Loaded sales data with {len(self.df)} records")
+            self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_sales_store(csv_path=DEFAULT_CSV_PATH):
+    """Return the shared store for a CSV path, creating it on first use"""
+    key = os.path.abspath(csv_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SalesDataStore(csv_path)
+        return store
+
+
+def load_sales_data(csv_path=DEFAULT_CSV_PATH):
+    """Return the shared, read-only sales DataFrame for a CSV path"""
+    return get_sales_store(csv_path).get()
+
+
+def warm_cache(csv_path=DEFAULT_CSV_PATH, force=False):
+    """
+    Build the binary cache for a CSV ahead of time (e.g. at deploy)
+
+    Args:
+        csv_path (str): Path to the source CSV
+        force (bool): Rebuild even if the existing cache is current
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is required to build the sales cache")
+
+    cache_path = cache_path_for(csv_path)
+    if force and os.path.exists(cache_path):
+        os.remove(cache_path)
+    df, version = load_sales_frame(csv_path)
+    print(f"✅ Sales cache ready: {cache_path} ({len(df)} records, source {version[:12]})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-build the binary sales data cache")
+    parser.add_argument("csv_path", nargs="?", default=DEFAULT_CSV_PATH, help="Source CSV file")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cache is current")
+    args = parser.parse_args()
+    warm_cache(args.csv_path, force=args.force)
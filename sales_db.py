@@ -0,0 +1,217 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+import sales_data
+
+DEFAULT_DB_PATH = "sales.db"
+SALES_TABLE = "sales"
+SOURCE_TABLE = "sales_source"
+
+# Bumped when the table layout or indexes change, so existing files are rebuilt
+SCHEMA_VERSION = "2"
+
+# Indexes for the columns generated queries filter and group on. Each dimension
+# index continues with sale_date, so "dimension = x AND sale_date BETWEEN ..." is
+# one range scan. It also carries the summed measures, so GROUP BY dimension
+# reads the index in order without visiting the table rows.
+INDEX_MEASURES = ['sale_amount', 'final_tons_sold']
+SALES_INDEXES = {
+    'sale_date': ['sale_date'],
+    'customer_name': ['customer_name', 'sale_date'] + INDEX_MEASURES,
+    'customer_category': ['customer_category', 'sale_date'] + INDEX_MEASURES,
+    'warehouse_region': ['warehouse_region', 'sale_date'] + INDEX_MEASURES,
+    'product_name': ['product_name', 'sale_date'] + INDEX_MEASURES,
+}
+
+# Read-only connections kept open for query execution
+QUERY_POOL_SIZE = 8
+
+# Per-connection page cache (KiB), memory-mapped I/O window (bytes)
+CACHE_SIZE_KIB = 64 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+
+_build_lock = threading.Lock()
+
+
+def _connect(db_path):
+    # Autocommit mode so transactions can be opened explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    # WAL lets readers keep querying while a build or append is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only syncs at checkpoints and is still safe against corruption
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    # Index builds sort in memory instead of temp files
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def create_query_engine(db_path=DEFAULT_DB_PATH, pool_size=QUERY_POOL_SIZE):
+    """
+    Create a pooled SQLAlchemy engine of read-only connections
+
+    Generated SQL runs through this engine. Connections open the file with
+    mode=ro and query_only, so a bad statement cannot modify the table.
+    The connections are shared across Streamlit session threads. Each one
+    reads the file through mmap with a large page cache, and keeps
+    GROUP BY/ORDER BY temporaries in memory.
+    """
+    uri = f"file:{Path(os.path.abspath(db_path)).as_posix()}?mode=ro"
+    engine = create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False),
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_query_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.close()
+
+    return engine
+
+
+def _read_source_info(conn):
+    """Return the fingerprint of the CSV the table was last built from"""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if SALES_TABLE not in tables or SOURCE_TABLE not in tables:
+        return None
+    return dict(conn.execute(f"SELECT key, value FROM {SOURCE_TABLE}").fetchall())
+
+
+def _write_source_info(conn, sha256, size, row_count):
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {SOURCE_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {SOURCE_TABLE} (key, value) VALUES (?, ?)",
+        [
+            ('source_sha256', sha256),
+            ('schema_version', SCHEMA_VERSION),
+            ('source_size', str(size)),
+            ('row_count', str(row_count)),
+            ('updated_at', datetime.now().isoformat(timespec='seconds')),
+        ]
+    )
+
+
+def _sqlite_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    # Categorical, string and ISO-8601 date columns
+    return 'TEXT'
+
+
+def _create_sales_table(conn, df):
+    columns = ", ".join(
+        f'"{col}" {_sqlite_type(df[col].dtype)}' + (' NOT NULL' if col == 'sale_date' else '')
+        for col in df.columns
+    )
+    conn.execute(f"CREATE TABLE {SALES_TABLE} ({columns})")
+
+
+def _create_indexes(conn):
+    for name, columns in SALES_INDEXES.items():
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{SALES_TABLE}_{name} ON {SALES_TABLE} ({column_list})")
+    # Row counts and value distributions for the query planner's index choice
+    conn.execute("ANALYZE")
+
+
+def _insert_rows(conn, df):
+    """Insert a typed sales frame, storing sale_date as ISO-8601 text"""
+    frame = df.assign(sale_date=df['sale_date'].dt.strftime('%Y-%m-%d %H:%M:%S.%f'))
+    columns = ", ".join(f'"{col}"' for col in frame.columns)
+    placeholders = ", ".join("?" * len(frame.columns))
+    conn.executemany(
+        f"INSERT INTO {SALES_TABLE} ({columns}) VALUES ({placeholders})",
+        frame.itertuples(index=False, name=None)
+    )
+
+
+def rebuild_sales_table(conn, df, version, size):
+    """
+    Replace the sales table (and its source fingerprint) in an open connection
+
+    Args:
+        conn (sqlite3.Connection): Connection to build in (the caller manages the transaction)
+        df (pd.DataFrame): Typed sales frame
+        version (str): Content hash of the CSV that df was loaded from
+        size (int): Size of that CSV in bytes
+    """
+    conn.execute(f"DROP TABLE IF EXISTS {SALES_TABLE}")
+    conn.execute(f"DROP TABLE IF EXISTS {SOURCE_TABLE}")
+    _create_sales_table(conn, df)
+    _insert_rows(conn, df)
+    _create_indexes(conn)
+    _write_source_info(conn, version, size, len(df))
+
+
+def sync_sales_table(csv_path=sales_data.DEFAULT_CSV_PATH, db_path=DEFAULT_DB_PATH, df=None, version=None):
+    """
+    Bring the on-disk `sales` table in line with the CSV
+
+    The table is rebuilt only when the CSV content changed in a way other
+    than appending rows, or when it was built with an older SCHEMA_VERSION.
+    If the CSV grew by appended lines, only the new rows are inserted. If
+    it is unchanged, nothing is written. The work runs under an immediate
+    write transaction, so concurrent processes wait for one builder instead
+    of racing on the file.
+
+    Args:
+        csv_path (str): Source CSV file
+        db_path (str): SQLite database file
+        df (pd.DataFrame): Typed sales frame (loaded from the shared store if omitted)
+        version (str): Content hash of the CSV that df was loaded from
+
+    Returns:
+        str: 'reused', 'appended' or 'rebuilt'
+    """
+    if df is None or version is None:
+        df, version = sales_data.get_sales_store(csv_path).snapshot()
+
+    with _build_lock:
+        conn = _connect(db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                info = _read_source_info(conn)
+                if info is not None and info.get('schema_version') != SCHEMA_VERSION:
+                    info = None
+                if info is not None and info.get('source_sha256') == version:
+                    status = 'reused'
+                else:
+                    appended = None
+                    if info is not None:
+                        appended = sales_data.read_appended_rows(
+                            csv_path, int(info.get('source_size', -1)), info.get('source_sha256')
+                        )
+                    if appended is not None:
+                        rows, sha256, size = appended
+                        _insert_rows(conn, rows)
+                        _write_source_info(conn, sha256, size, int(info.get('row_count', 0)) + len(rows))
+                        status = 'appended'
+                    else:
+                        rebuild_sales_table(conn, df, version, os.path.getsize(csv_path))
+                        status = 'rebuilt'
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    return status
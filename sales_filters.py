@@ -0,0 +1,223 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import name_index
+
+# Categorical columns the Overview sidebar filters on
+FILTER_COLUMNS = ['customer_name', 'customer_category', 'warehouse_region', 'product_name']
+
+# Memoized selections kept per engine (row positions), sliced frames and option lists
+MAX_CACHED_SELECTIONS = 64
+MAX_CACHED_FRAMES = 8
+MAX_CACHED_OPTIONS = 32
+
+
+def day_ordinal(value):
+    """Days since 1970-01-01 for a date, datetime or Timestamp"""
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+class DateIndex:
+    """
+    Binary-search date range lookup over a column sorted by date
+
+    A date range maps to one contiguous block of rows, found with two
+    np.searchsorted calls. The cost is O(log n) however long the history is.
+    """
+
+    def __init__(self, dates):
+        self.days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+        if len(self.days) > 1 and (np.diff(self.days) < 0).any():
+            raise ValueError("DateIndex needs rows sorted by date")
+
+    def slice(self, start_date, end_date):
+        """Return the slice of rows from start_date through end_date (both inclusive)"""
+        lo = int(np.searchsorted(self.days, day_ordinal(start_date), side='left'))
+        hi = int(np.searchsorted(self.days, day_ordinal(end_date), side='right'))
+        return slice(lo, max(lo, hi))
+
+
+class FilterOptions:
+    """
+    Sidebar option lists per date range
+
+    The sorted category values of each filter column are kept once, as
+    arrays. The options present in a date range come from one np.bincount
+    over the codes in that range's row block, with no hashing and no
+    sorting. Results are memoized per date range.
+    """
+
+    def __init__(self, dates, codes, categories):
+        self.dates = dates
+        self.codes = codes
+        # Sorted values per column, and the code of each sorted position
+        self.order = {col: np.argsort(np.asarray(cats, dtype=object), kind='stable') for col, cats in categories.items()}
+        self.values = {col: np.asarray(cats, dtype=object)[self.order[col]] for col, cats in categories.items()}
+        self._options = OrderedDict()
+        self._lock = threading.Lock()
+
+    def present(self, column, codes):
+        """Sorted values of a column whose codes occur in codes"""
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.values[column]))
+        return self.values[column][counts[self.order[column]] > 0].tolist()
+
+    def for_dates(self, start_date, end_date):
+        """
+        Options of every filter column present between two dates
+
+        Args:
+            start_date (date): First day included
+            end_date (date): Last day included
+
+        Returns:
+            dict: Column name -> sorted list of values (shared, do not modify)
+        """
+        key = (np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D'))
+        with self._lock:
+            options = self._options.get(key)
+            if options is not None:
+                self._options.move_to_end(key)
+                return options
+
+        window = self.dates.slice(start_date, end_date)
+        options = {col: self.present(col, codes[window]) for col, codes in self.codes.items()}
+        with self._lock:
+            self._options[key] = options
+            if len(self._options) > MAX_CACHED_OPTIONS:
+                self._options.popitem(last=False)
+        return options
+
+
+class FilterEngine:
+    """
+    Vectorized sidebar filters over one version of the sales data
+
+    The date index and categorical codes are computed once per data version.
+    The date range is found by binary search (the store keeps rows sorted
+    by sale_date). The other filters become a single boolean mask over the
+    rows in that range, built in place from code lookup tables. The result
+    is an array of row positions instead of a chain of copied frames.
+    Selections are memoized per filter tuple, so a rerun with unchanged
+    widgets does no work. The customer name search resolves to customer
+    codes through a NameIndex over the distinct names, built on first use.
+    """
+
+    def __init__(self, df, version=None):
+        self.df = df
+        self.version = version
+        self.dates = DateIndex(df['sale_date'])
+        self.codes = {col: df[col].cat.codes.to_numpy() for col in FILTER_COLUMNS}
+        self.categories = {col: df[col].cat.categories for col in FILTER_COLUMNS}
+        self._selections = OrderedDict()
+        self._frames = OrderedDict()
+        self._name_index = None
+        self._lock = threading.Lock()
+        self.filter_options = FilterOptions(self.dates, self.codes, self.categories)
+
+    @property
+    def name_index(self):
+        """Substring/prefix/LIKE index over the customer_name categories"""
+        with self._lock:
+            if self._name_index is None:
+                self._name_index = name_index.NameIndex(self.categories['customer_name'])
+            return self._name_index
+
+    def _code_lookup(self, column, wanted):
+        """
+        Boolean table indexed by category code, True for wanted codes
+
+        The table has one extra False slot at the end, so missing values
+        (code -1) never match.
+        """
+        lookup = np.zeros(len(self.categories[column]) + 1, dtype=bool)
+        lookup[wanted] = True
+        return lookup
+
+    def _values_lookup(self, column, values):
+        positions = self.categories[column].get_indexer(list(values))
+        return self._code_lookup(column, positions[positions >= 0])
+
+    def _search_lookup(self, text):
+        return self._code_lookup('customer_name', self.name_index.contains(text))
+
+    def _compute(self, key):
+        start, end, customers, category, region, product, search = key
+        window = self.dates.slice(start, end)
+
+        lookups = []
+        if customers:
+            lookups.append(('customer_name', self._values_lookup('customer_name', customers)))
+        if category != 'All':
+            lookups.append(('customer_category', self._values_lookup('customer_category', [category])))
+        if region != 'All':
+            lookups.append(('warehouse_region', self._values_lookup('warehouse_region', [region])))
+        if product != 'All':
+            lookups.append(('product_name', self._values_lookup('product_name', [product])))
+        if search:
+            lookups.append(('customer_name', self._search_lookup(search)))
+
+        if lookups:
+            mask = np.ones(window.stop - window.start, dtype=bool)
+            for column, lookup in lookups:
+                np.logical_and(mask, lookup[self.codes[column][window]], out=mask)
+            rows = np.flatnonzero(mask) + window.start
+        else:
+            rows = np.arange(window.start, window.stop)
+        rows.flags.writeable = False
+        return rows
+
+    def select(self, start_date, end_date, customers=(), category='All', region='All',
+               product='All', search=''):
+        """
+        Row positions matching the sidebar filters
+
+        Args:
+            start_date (date): First day included
+            end_date (date): Last day included
+            customers (list): Customer names to keep (empty keeps all)
+            category (str): Customer category, or 'All'
+            region (str): Warehouse region, or 'All'
+            product (str): Product name, or 'All'
+            search (str): Case-insensitive substring of the customer name
+
+        Returns:
+            np.ndarray: Read-only array of matching row positions
+        """
+        key = (np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D'), tuple(customers),
+               category, region, product, search.strip().lower())
+        with self._lock:
+            rows = self._selections.get(key)
+            if rows is not None:
+                self._selections.move_to_end(key)
+                return rows
+
+        rows = self._compute(key)
+        with self._lock:
+            self._selections[key] = rows
+            if len(self._selections) > MAX_CACHED_SELECTIONS:
+                self._selections.popitem(last=False)
+        return rows
+
+    def frame(self, *args, **kwargs):
+        """
+        Filtered rows as a DataFrame (same arguments as select)
+
+        The frame is taken in one step from the row positions and memoized
+        for the same selection. It is shared, so callers must not modify it.
+        """
+        rows = self.select(*args, **kwargs)
+        key = id(rows)
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is not None and entry[0] is rows:
+                self._frames.move_to_end(key)
+                return entry[1]
+
+        filtered = self.df.take(rows)
+        with self._lock:
+            self._frames[key] = (rows, filtered)
+            if len(self._frames) > MAX_CACHED_FRAMES:
+                self._frames.popitem(last=False)
+        return filtered
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import numpy as np
+
+import sales_data
+import sales_filters
+import time_buckets
+
+# Grain of the cube below the day: every dimension the Overview charts and filters use
+ROLLUP_DIMENSIONS = ['customer_category', 'warehouse_region', 'product_name', 'customer_name']
+ROLLUP_MEASURES = ['sale_amount', 'final_tons_sold']
+
+
+def _aggregate(frame):
+    """Sum measures and order counts per (day, dimensions) cell, sorted by day"""
+    grouped = frame.groupby(['sale_date'] + ROLLUP_DIMENSIONS, observed=True, sort=True, dropna=False)
+    return grouped[ROLLUP_MEASURES + ['orders']].sum().reset_index()
+
+
+def build_rollup(df):
+    """
+    Aggregate sales transactions to day x category x region x product x customer
+
+    Args:
+        df (pd.DataFrame): Typed sales rows
+
+    Returns:
+        pd.DataFrame: One row per cell with summed sale_amount and
+        final_tons_sold and the number of orders, sorted by sale_date
+    """
+    frame = df[['sale_date'] + ROLLUP_DIMENSIONS + ROLLUP_MEASURES].assign(
+        sale_date=df['sale_date'].dt.normalize(),
+        orders=np.int64(1),
+    )
+    return _aggregate(frame)
+
+
+class SalesRollup:
+    """
+    Pre-aggregated sales cube for the Overview charts
+
+    The cube has the same column names as the transactions, so the
+    charts run their usual groupbys on it. They re-aggregate a few thousand
+    cells instead of every sale. Filtering goes through a FilterEngine over
+    the cube rows, since every sidebar filter is a cube dimension. Period
+    codes for the trend charts are kept in `periods`.
+    """
+
+    def __init__(self, cube, version):
+        self.cube = cube
+        self.version = version
+        self.filters = sales_filters.FilterEngine(cube, version)
+        self.periods = time_buckets.TimeBuckets(cube['sale_date'])
+        self._orders = cube['orders'].to_numpy()
+
+    @classmethod
+    def from_frame(cls, df, version):
+        """Build the cube from the full set of transactions"""
+        return cls(build_rollup(df), version)
+
+    def appended(self, rows, version):
+        """
+        Return a new cube that also includes appended transactions
+
+        Only the new rows are aggregated. They are merged into the existing
+        cells, so the cost follows the cube size, not the transaction count.
+        """
+        merged = sales_data.append_sales_rows(self.cube, build_rollup(rows))
+        return SalesRollup(_aggregate(merged), version)
+
+    def order_count(self, rows):
+        """Number of transactions in the given cube rows"""
+        return int(self._orders[rows].sum())
+
+
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def get_sales_rollup(csv_path=sales_data.DEFAULT_CSV_PATH):
+    """
+    Return the rollup cube for the current sales data
+
+    The cube is built once per process. When the store only had rows
+    appended since the cube was built, the cube is updated from those rows.
+    Any other change rebuilds it.
+    """
+    store = sales_data.get_sales_store(csv_path)
+    df, version = store.snapshot()
+    key = os.path.abspath(csv_path)
+    with _rollups_lock:
+        rollup = _rollups.get(key)
+        if rollup is not None and rollup.version == version:
+            return rollup
+
+        rows = store.appended_since(rollup.version) if rollup is not None else None
+        if rows is not None:
+            rollup = rollup.appended(rows, version)
+            print(f"✅ Rollup cube updated with {len(rows)} new sales ({len(rollup.cube)} cells)")
+        else:
+            rollup = SalesRollup.from_frame(df, version)
+            print(f"✅ Rollup cube built: {len(df)} sales -> {len(rollup.cube)} cells")
+        _rollups[key] = rollup
+        return rollup
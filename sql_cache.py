@@ -0,0 +1,235 @@
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_CACHE_PATH = "sql_cache.db"
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+# Minimum TF-IDF cosine similarity for a rephrased question to reuse SQL
+SIMILARITY_THRESHOLD = 0.85
+
+NUMBER_WORDS = {
+    'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+    'six': '6', 'seven': '7', 'eight': '8', 'nine': '9', 'ten': '10',
+    'eleven': '11', 'twelve': '12', 'fifteen': '15', 'twenty': '20',
+    'fifty': '50', 'hundred': '100',
+}
+
+# Words that do not change the meaning of an analytics question
+FILLER_WORDS = {
+    'a', 'an', 'the', 'me', 'us', 'i', 'we', 'you', 'our', 'my', 'please',
+    'show', 'list', 'give', 'get', 'find', 'display', 'tell', 'what', 'which',
+    'is', 'are', 'was', 'were', 'can', 'could', 'would', 'want', 'to', 'see',
+    'of', 'all', 'do', 'does', 'have', 'has', 'about', 'there', 'how', 'much',
+}
+
+# Words that mean the same thing in a question about the sales table (stemmed form -> canonical form)
+SYNONYMS = {
+    'tonne': 'ton', 'client': 'customer', 'buyer': 'customer', 'item': 'product',
+    'avg': 'average', 'mean': 'average', 'sum': 'total', '<>': '!=',
+}
+
+# Words, numbers, comparison operators (=, !=, <>, <, <=, >, >=) and units
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?|<>|[<>!]=|[<>=]|[$%]")
+
+
+def normalize_question(question):
+    """Lower-case, strip emojis and punctuation, and spell numbers as digits"""
+    tokens = _TOKEN_RE.findall(question.lower())
+    return " ".join(NUMBER_WORDS.get(tok, tok) for tok in tokens)
+
+
+def _stem(token):
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def content_tokens(normalized):
+    """Meaningful tokens of a normalized question (stemmed, synonyms unified), used for similarity matching"""
+    tokens = (_stem(tok) for tok in normalized.split() if tok not in FILLER_WORDS)
+    return [SYNONYMS.get(tok, tok) for tok in tokens]
+
+
+def _meaning(tokens):
+    """Content tokens in question order; two questions only share SQL when these are equal"""
+    return tuple(SYNONYMS.get(tok, tok) for tok in tokens)
+
+
+class SQLGenerationCache:
+    """
+    Persistent two-level cache of natural-language-to-SQL generations
+
+    Level one is an exact match on the normalized question. Level two is a
+    TF-IDF cosine match over content tokens, so rephrasings such as "top 10
+    customers by revenue" and "show me top ten customers by revenue" share
+    an entry. A similar match is only accepted when the two questions have
+    the same content tokens in the same order, i.e. they differ by nothing
+    but filler words, synonyms, number spelling and plurals. Any other word
+    (a month, a measure, a dimension, a region name, a negation or a
+    comparison operator) or a different word order can change the answer.
+    Entries are scoped by a schema fingerprint and evicted by TTL and
+    least-recent use.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS, similarity_threshold=SIMILARITY_THRESHOLD):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.stats = {'exact_hits': 0, 'similar_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._entries = {}  # (schema_fp, normalized) -> dict(tokens, sql, created_at)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sql_cache (
+                    schema_fp TEXT NOT NULL,
+                    normalized TEXT NOT NULL,
+                    tokens TEXT NOT NULL,
+                    sql TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (schema_fp, normalized)
+                )
+            """)
+            self._purge_expired(conn)
+            for schema_fp, normalized, tokens, sql, created_at in conn.execute(
+                    "SELECT schema_fp, normalized, tokens, sql, created_at FROM sql_cache"):
+                self._entries[(schema_fp, normalized)] = {
+                    'tokens': json.loads(tokens), 'sql': sql, 'created_at': created_at
+                }
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _purge_expired(self, conn):
+        cutoff = time.time() - self.ttl_seconds
+        conn.execute("DELETE FROM sql_cache WHERE created_at < ?", (cutoff,))
+        for key in [k for k, e in self._entries.items() if e['created_at'] < cutoff]:
+            del self._entries[key]
+
+    def _load_entry(self, key):
+        """Pick up an exact entry written by another process"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT tokens, sql, created_at FROM sql_cache WHERE schema_fp = ? AND normalized = ?", key
+            ).fetchone()
+        if row is None:
+            return None
+        entry = self._entries[key] = {'tokens': json.loads(row[0]), 'sql': row[1], 'created_at': row[2]}
+        return entry
+
+    def _similar(self, schema_fp, tokens):
+        """Return (score, key) of the best similar entry for the same schema"""
+        candidates = [(key, e) for key, e in self._entries.items() if key[0] == schema_fp]
+        if not candidates or not tokens:
+            return 0.0, None
+
+        # Document frequencies over the cached questions plus the query
+        docs = [set(e['tokens']) for _, e in candidates] + [set(tokens)]
+        df = Counter(tok for doc in docs for tok in doc)
+        n_docs = len(docs)
+
+        def vector(toks):
+            counts = Counter(toks)
+            return {t: c * (math.log((1 + n_docs) / (1 + df[t])) + 1) for t, c in counts.items()}
+
+        query_vec = vector(tokens)
+        query_norm = math.sqrt(sum(v * v for v in query_vec.values()))
+        meaning = _meaning(tokens)
+
+        best_score, best_key = 0.0, None
+        for key, entry in candidates:
+            if not entry['tokens'] or _meaning(entry['tokens']) != meaning:
+                continue
+            vec = vector(entry['tokens'])
+            norm = math.sqrt(sum(v * v for v in vec.values()))
+            score = sum(w * vec.get(t, 0.0) for t, w in query_vec.items()) / (query_norm * norm)
+            if score > best_score:
+                best_score, best_key = score, key
+        return best_score, best_key
+
+    def lookup(self, question, schema_fp):
+        """
+        Return cached SQL for a question, or None on a miss
+
+        Args:
+            question (str): Natural language question
+            schema_fp (str): Fingerprint of the schema/prompt the SQL was generated for
+
+        Returns:
+            str or None: Cached SQL query
+        """
+        normalized = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            key = (schema_fp, normalized)
+            entry = self._entries.get(key) or self._load_entry(key)
+            if entry is not None and now - entry['created_at'] <= self.ttl_seconds:
+                self.stats['exact_hits'] += 1
+            else:
+                score, key = self._similar(schema_fp, content_tokens(normalized))
+                entry = self._entries.get(key) if score >= self.similarity_threshold else None
+                if entry is None or now - entry['created_at'] > self.ttl_seconds:
+                    self.stats['misses'] += 1
+                    return None
+                self.stats['similar_hits'] += 1
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sql_cache SET last_used = ?, hits = hits + 1 WHERE schema_fp = ? AND normalized = ?",
+                (now, key[0], key[1])
+            )
+        return entry['sql']
+
+    def store(self, question, schema_fp, sql):
+        """Remember the SQL generated for a question, evicting the least recently used entries"""
+        normalized = normalize_question(question)
+        tokens = content_tokens(normalized)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sql_cache (schema_fp, normalized, tokens, sql, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (schema_fp, normalized, json.dumps(tokens), sql, now, now)
+            )
+            self._entries[(schema_fp, normalized)] = {'tokens': tokens, 'sql': sql, 'created_at': now}
+            self.stats['stores'] += 1
+
+            self._purge_expired(conn)
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                evicted = conn.execute(
+                    "SELECT schema_fp, normalized FROM sql_cache ORDER BY last_used ASC LIMIT ?", (overflow,)
+                ).fetchall()
+                conn.executemany("DELETE FROM sql_cache WHERE schema_fp = ? AND normalized = ?", evicted)
+                for key in evicted:
+                    self._entries.pop(tuple(key), None)
+                self.stats['evictions'] += len(evicted)
+
+    def discard_sql(self, schema_fp, sql):
+        """Drop every entry that maps to a SQL query, e.g. when it failed to execute"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM sql_cache WHERE schema_fp = ? AND sql = ?", (schema_fp, sql))
+            for key in [k for k, e in self._entries.items() if k[0] == schema_fp and e['sql'] == sql]:
+                del self._entries[key]
+
+    def get_stats(self):
+        """Return hit/miss counters and the current number of entries"""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import ai_insights
+import insight_cache
+
+CHART = {'categories': ['Local', 'Export'], 'values': [100.0, 50.0]}
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class Completions:
+    """Chat completions that stream a few pieces, then finish or lose the connection"""
+
+    def __init__(self, broken):
+        self.broken = broken
+
+    def create(self, **kwargs):
+        yield chunk("📈 Revenue ")
+        yield chunk("grew")
+        if self.broken:
+            raise ConnectionError("connection reset")
+
+
+def make_analyzer(tmp_path, broken):
+    analyzer = ai_insights.AIInsightsAnalyzer("key", cache=insight_cache.InsightCache(str(tmp_path / "insights.db")))
+    analyzer.client = SimpleNamespace(chat=SimpleNamespace(completions=Completions(broken)))
+    return analyzer
+
+
+def test_complete_stream_is_cached(tmp_path):
+    analyzer = make_analyzer(tmp_path, broken=False)
+    assert analyzer.analyze_chart_data(CHART, 'customer_category_pie', on_token=lambda text: None) == "📈 Revenue grew"
+    assert analyzer.insight_cache.get_stats()['stores'] == 1
+
+
+def test_broken_stream_is_reported_and_not_cached(tmp_path):
+    analyzer = make_analyzer(tmp_path, broken=True)
+    streamed = []
+    insight = analyzer.analyze_chart_data(CHART, 'customer_category_pie', on_token=streamed.append)
+    assert insight == "❌ Analysis unavailable: connection reset"
+    assert streamed[:2] == ["📈 Revenue ", "grew"]
+    assert analyzer.insight_cache.get_stats()['stores'] == 0
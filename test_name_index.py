@@ -0,0 +1,25 @@
+import name_index
+
+NAMES = ["Central Wholesale Co", "O'Brien Mills", "Downtown Grains", "Grainhouse Traders"]
+
+
+def rewrite(sql):
+    return name_index.rewrite_like_predicates(sql, 'customer_name', name_index.NameIndex(NAMES))
+
+
+def test_like_becomes_in_list():
+    assert rewrite("SELECT * FROM sales WHERE customer_name LIKE '%grain%'") == \
+        "SELECT * FROM sales WHERE customer_name IN ('Downtown Grains', 'Grainhouse Traders')"
+    assert rewrite("SELECT * FROM sales s WHERE s.customer_name NOT LIKE 'o''br%'") == \
+        "SELECT * FROM sales s WHERE s.customer_name NOT IN ('O''Brien Mills')"
+
+
+def test_escape_clause_is_left_unchanged():
+    sql = "SELECT * FROM sales WHERE customer_name LIKE '%O''Br%' ESCAPE '\\' OR customer_name LIKE 'Central%'"
+    assert rewrite(sql) == \
+        "SELECT * FROM sales WHERE customer_name LIKE '%O''Br%' ESCAPE '\\' OR customer_name IN ('Central Wholesale Co')"
+
+
+def test_other_columns_are_left_unchanged():
+    sql = "SELECT * FROM sales WHERE product_name LIKE '%grain%'"
+    assert rewrite(sql) == sql
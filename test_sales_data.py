@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import pytest
+
+import sales_data
+
+ROW = "2030-01-01 00:00:00,Downtown Grains Ltd,Local,Medium,{rating},No,0,Organic Maize,250,Redrock Depot,West Coast,1.0,250.0\n"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "sales.csv"
+    shutil.copy(sales_data.DEFAULT_CSV_PATH, path)
+    return str(path)
+
+
+def append_row(csv_path, rating):
+    stat = os.stat(csv_path)
+    with open(csv_path, 'a') as f:
+        f.write(ROW.format(rating=rating))
+    # Make sure the store sees a new mtime even on coarse-grained filesystems
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_append_merges_new_rows(csv_path):
+    store = sales_data.SalesDataStore(csv_path)
+    before, version = store.snapshot()
+    append_row(csv_path, 5)
+    after, _ = store.snapshot()
+    assert len(after) == len(before) + 1
+    assert store.appended_since(version) is not None
+    assert after['satisfaction_rating'].dtype == 'int8'
+
+
+@pytest.mark.parametrize("rating", ["300", ""])
+def test_append_outside_column_type_reloads(csv_path, rating):
+    store = sales_data.SalesDataStore(csv_path)
+    before, version = store.snapshot()
+    append_row(csv_path, rating)
+    after, _ = store.snapshot()
+    assert len(after) == len(before) + 1
+    assert store.appended_since(version) is None
+    expected = sales_data.read_sales_csv(csv_path)['satisfaction_rating']
+    assert after['satisfaction_rating'].equals(expected)
+    # The Feather cache, if written, holds the same values
+    reloaded, _ = sales_data.load_sales_frame(csv_path)
+    assert reloaded['satisfaction_rating'].equals(expected)
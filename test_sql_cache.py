@@ -0,0 +1,40 @@
+import pytest
+
+import sql_cache
+
+SCHEMA = "schema"
+BASE = "Show total revenue for Local customers in the West Coast region in {month} 2024 grouped by {groups}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return sql_cache.SQLGenerationCache(path=str(tmp_path / "sql_cache.db"))
+
+
+def test_rephrased_question_reuses_sql(cache):
+    cache.store("Top 10 customers by revenue", SCHEMA, "SELECT 1")
+    assert cache.lookup("🏆 Show me the top ten customers by revenue", SCHEMA) == "SELECT 1"
+    assert cache.get_stats()['similar_hits'] == 1
+
+
+def test_synonyms_reuse_sql(cache):
+    cache.store("Total tons sold per client", SCHEMA, "SELECT 1")
+    assert cache.lookup("total tonnes sold per customer", SCHEMA) == "SELECT 1"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    (BASE.format(month="January", groups="product"), BASE.format(month="February", groups="product")),
+    (BASE.format(month="January", groups="product and warehouse"),
+     BASE.format(month="January", groups="product and customer")),
+    ("Total revenue by region", "Total tons by region"),
+    ("Total revenue on Monday", "Total revenue on Friday"),
+    ("Top 10 customers by revenue", "Top 20 customers by revenue"),
+    ("Top 10 customers by product", "Top 10 products by customer"),
+    ("Sales where rating = 5", "Sales where rating != 5"),
+    ("Sales where rating = 5", "Sales where rating <> 5"),
+    ("Sales for Local customers", "Sales excluding Local customers"),
+])
+def test_different_question_misses(cache, cached, asked):
+    cache.store(cached, SCHEMA, "SELECT 1")
+    assert cache.lookup(asked, SCHEMA) is None
+    assert cache.get_stats()['misses'] == 1
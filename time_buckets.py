@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ['day', 'week', 'month', 'quarter']
+
+
+def day_ordinals(dates):
+    """Days since 1970-01-01 for an array-like of datetimes"""
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def period_codes(days, granularity):
+    """
+    Integer period code for each day ordinal
+
+    Codes increase with time, so sorted days give sorted codes:
+    day = day ordinal, week = ISO (Monday-based) week number since
+    1969-12-29, month = months since 1970-01, quarter = quarters since 1970-Q1.
+    """
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday, so Monday-based weeks start 3 days earlier
+        return (days + 3) // 7
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if granularity == 'month':
+        return months
+    if granularity == 'quarter':
+        return months // 3
+    raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+
+def period_labels(codes, granularity):
+    """
+    Display labels for period codes
+
+    Only called for the output buckets, never per row. Formats:
+    '2024-03-15', '2024-W11' (ISO week), '2024-03', '2024-Q1'.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    if granularity == 'day':
+        return np.datetime_as_string(codes.astype('datetime64[D]'), unit='D')
+    if granularity == 'week':
+        iso = pd.DatetimeIndex((codes * 7 - 3).astype('datetime64[D]')).isocalendar()
+        return np.array([f"{year}-W{week:02d}" for year, week in zip(iso['year'], iso['week'])])
+    if granularity == 'month':
+        return np.datetime_as_string(codes.astype('datetime64[M]'), unit='M')
+    if granularity == 'quarter':
+        return np.array([f"{1970 + code // 4}-Q{code % 4 + 1}" for code in codes])
+    raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+
+def _sum_by_code(codes, values):
+    """Return (distinct codes ascending, summed values) for each code"""
+    if len(codes) == 0:
+        return codes[:0], np.zeros(0, dtype=np.float64)
+    if (codes[1:] >= codes[:-1]).all():
+        # Date-sorted input: each period is a contiguous run
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        return codes[starts], np.add.reduceat(values, starts)
+    keys, inverse = np.unique(codes, return_inverse=True)
+    return keys, np.bincount(inverse, weights=values, minlength=len(keys))
+
+
+def _period_frame(keys, sums, granularity, label, value_name):
+    return pd.DataFrame({label: period_labels(keys, granularity), value_name: sums})
+
+
+def sum_by_period(dates, values, granularity='month', label='period'):
+    """
+    Sum values per time period
+
+    Args:
+        dates (pd.Series): Datetimes of the rows
+        values (pd.Series): Values to add up
+        granularity (str): 'day', 'week', 'month' or 'quarter'
+        label (str): Name of the output period column
+
+    Returns:
+        pd.DataFrame: Period labels and sums, in time order
+    """
+    codes = period_codes(day_ordinals(dates), granularity)
+    keys, sums = _sum_by_code(codes, np.asarray(values, dtype=np.float64))
+    return _period_frame(keys, sums, granularity, label, getattr(values, 'name', None) or 'value')
+
+
+class TimeBuckets:
+    """
+    Period codes for one dataset, computed once per granularity
+
+    Charts can switch granularity or filter rows without recomputing the codes.
+    """
+
+    def __init__(self, dates):
+        self.days = day_ordinals(dates)
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    def codes(self, granularity):
+        """Integer period codes of every row for a granularity"""
+        with self._lock:
+            codes = self._codes.get(granularity)
+            if codes is None:
+                codes = self._codes[granularity] = period_codes(self.days, granularity)
+            return codes
+
+    def sum(self, values, granularity='month', rows=None, label='period', value_name='value'):
+        """
+        Sum values per period over all rows or the given row positions
+
+        Args:
+            values (np.ndarray): Values aligned with the dataset rows
+            granularity (str): 'day', 'week', 'month' or 'quarter'
+            rows (np.ndarray): Row positions to include (default: all rows)
+            label (str): Name of the output period column
+            value_name (str): Name of the output value column
+
+        Returns:
+            pd.DataFrame: Period labels and sums, in time order
+        """
+        codes = self.codes(granularity)
+        values = np.asarray(values, dtype=np.float64)
+        if rows is not None:
+            codes, values = codes[rows], values[rows]
+        keys, sums = _sum_by_code(codes, values)
+        return _period_frame(keys, sums, granularity, label, value_name)